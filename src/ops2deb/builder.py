@@ -77,8 +77,8 @@ def build_source_packages(package_paths: list[Path], workers: int) -> None:
 
     results = asyncio.run(_build_packages())
 
-    if errors := [e for e in results if isinstance(e, Exception)]:
-        raise Ops2debBuilderError(f"{len(errors)} failures occurred")
+    if errors := sum(1 for result in results if isinstance(result, Exception)):
+        raise Ops2debBuilderError(f"{errors} failures occurred")
 
 
 def find_and_build_source_packages(output_directory: Path, workers: int) -> None:
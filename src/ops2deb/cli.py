@@ -246,6 +246,13 @@ def update(
     max_versions: int = typer.Option(
         1, "-m", "--max-versions", envvar="OPS2DEB_MAX_VERSIONS"
     ),
+    cache_ttl: int = typer.Option(
+        0,
+        "--cache-ttl",
+        envvar="OPS2DEB_UPDATE_CACHE_TTL",
+        help="Don't look for new releases of blueprints found up to date less than "
+        "this many seconds ago. Disabled by default.",
+    ),
 ) -> None:
     try:
         resources = load_resources(configurations_search_pattern)
@@ -259,6 +266,7 @@ def update(
             skip,
             only,
             max_versions,
+            cache_ttl,
         )
     except Ops2debError as e:
         error(e, exit_code)
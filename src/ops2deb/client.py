@@ -1,8 +1,20 @@
+from importlib.util import find_spec
 from typing import Any
 
 import httpx
 
+# keep connections to the same hosts (github.com, release CDNs...) alive between requests
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=100, keepalive_expiry=30.0
+)
+
+# multiplex requests to the same host over a single connection when httpx[http2] is
+# installed, servers that don't support HTTP/2 are still reached over HTTP/1.1
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
 
 def client_factory(**kwargs: Any) -> httpx.AsyncClient:
-    transport = httpx.AsyncHTTPTransport(retries=1)
+    transport = httpx.AsyncHTTPTransport(
+        retries=1, limits=DEFAULT_LIMITS, http2=HTTP2_AVAILABLE
+    )
     return httpx.AsyncClient(transport=transport, follow_redirects=True, **kwargs)
@@ -4,7 +4,9 @@ import gzip
 import io
 import shutil
 import tarfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, BinaryIO
 
 import unix_ar
 import zstandard
@@ -13,33 +15,90 @@ from ops2deb import logger
 from ops2deb.exceptions import Ops2debExtractError
 from ops2deb.utils import log_and_raise
 
+# size of reads from archives, the 8 KiB default makes decompressors loop in python
+EXTRACT_READ_BUFFER_SIZE = 128 * 1024
+
 
 def _unpack_gz(file_path: str, extract_path: str) -> None:
     output_path = Path(extract_path) / Path(file_path).stem
     with output_path.open("wb") as output:
-        with gzip.open(file_path, "rb") as gz_archive:
-            shutil.copyfileobj(gz_archive, output)
+        with open(file_path, "rb", buffering=EXTRACT_READ_BUFFER_SIZE) as archive:
+            with gzip.GzipFile(fileobj=archive, mode="rb") as gz_archive:
+                shutil.copyfileobj(gz_archive, output, EXTRACT_READ_BUFFER_SIZE)
 
 
 def _unpack_bz2(file_path: str, extract_path: str) -> None:
     output_path = Path(extract_path) / Path(file_path).stem
     with output_path.open(mode="wb") as output:
-        with bz2.open(file_path, "rb") as bz2_archive:
-            shutil.copyfileobj(bz2_archive, output)
+        with open(file_path, "rb", buffering=EXTRACT_READ_BUFFER_SIZE) as archive:
+            with bz2.BZ2File(archive, mode="rb") as bz2_archive:
+                shutil.copyfileobj(bz2_archive, output, EXTRACT_READ_BUFFER_SIZE)
+
+
+def _extract_tar_stream(fileobj: BinaryIO, extract_path: str | Path) -> None:
+    with tarfile.open(
+        fileobj=fileobj, mode="r|*", bufsize=EXTRACT_READ_BUFFER_SIZE
+    ) as tar_file:
+        # members are written to disk in chunks of 16 KiB by default
+        tar_file.copybufsize = EXTRACT_READ_BUFFER_SIZE  # type: ignore[attr-defined]
+        tar_file.extractall(extract_path)
+
+
+class _ArMemberReader(io.RawIOBase):
+    """Read-only view on the data of a single member of an ar archive"""
+
+    def __init__(self, file: io.BufferedReader, offset: int, size: int):
+        self._file = file
+        self._remaining = size
+        file.seek(offset)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer)[: self._remaining]
+        read = self._file.readinto(view)
+        self._remaining -= read
+        return read
+
+
+def _unpack_deb_member(file_path: str, member: unix_ar.ArInfo, extract_path: str) -> None:
+    file_name = member.name.decode("utf-8")
+    with open(file_path, "rb") as deb_file:
+        tarball: BinaryIO = io.BufferedReader(
+            _ArMemberReader(deb_file, member.offset + 60, member.size),
+            buffer_size=EXTRACT_READ_BUFFER_SIZE,
+        )
+        if file_name.endswith(".zst"):
+            tarball = zstandard.ZstdDecompressor().stream_reader(tarball)
+        _extract_tar_stream(tarball, Path(extract_path) / file_name.split(".")[0])
 
 
 def _unpack_deb(file_path: str, extract_path: str) -> None:
+    # stream members from the ar archive to tarfile instead of loading them in memory,
+    # control and data tarballs are independent and decompressors release the GIL
     ar_file = unix_ar.open(file_path)
-    file_names = [info.name.decode("utf-8") for info in ar_file.infolist()]
-    for file_name in file_names:
-        if file_name.startswith("debian-binary"):
-            continue
-        tarball = ar_file.open(file_name)
-        tar_file = tarfile.open(fileobj=tarball)
-        try:
-            tar_file.extractall(Path(extract_path) / file_name.split(".")[0])
-        finally:
-            tar_file.close()
+    try:
+        members = [
+            member
+            for member in ar_file.infolist()
+            if not member.name.startswith(b"debian-binary")
+        ]
+    finally:
+        ar_file.close()
+    with ThreadPoolExecutor(max_workers=len(members) or 1) as executor:
+        futures = [
+            executor.submit(_unpack_deb_member, file_path, member, extract_path)
+            for member in members
+        ]
+        for future in futures:
+            future.result()
+
+
+def _unpack_tar(file_path: str, extract_path: str) -> None:
+    # stream mode reads the archive once, without seeking back in the decompressed data
+    with open(file_path, "rb", buffering=EXTRACT_READ_BUFFER_SIZE) as archive:
+        _extract_tar_stream(archive, extract_path)
 
 
 def _unpack_zst(file_path: str, extract_path: str) -> None:
@@ -51,12 +110,18 @@ def _unpack_zst(file_path: str, extract_path: str) -> None:
 
 def _unpack_tar_zst(file_path: str, extract_path: str) -> None:
     dctx = zstandard.ZstdDecompressor()
-    with open(file_path, "rb") as ifh, io.BytesIO() as ofh:
-        dctx.copy_stream(ifh, ofh)
-        ofh.seek(0)
-        with tarfile.open(fileobj=ofh) as tar_file:
-            tar_file.extractall(extract_path)
+    with open(file_path, "rb") as ifh, dctx.stream_reader(ifh) as reader:
+        _extract_tar_stream(reader, extract_path)
+
 
+# tarballs are streamed by _unpack_archive, shutil tar unpackers are left untouched
+# because they are shared with the rest of the process
+TAR_EXTENSIONS = tuple(
+    extension
+    for name, extensions, _ in shutil.get_unpack_formats()
+    if name in ["tar", "gztar", "bztar", "xztar"]
+    for extension in extensions
+)
 
 shutil.register_unpack_format("gz", [".gz"], _unpack_gz)
 shutil.register_unpack_format("bz2", [".bz2"], _unpack_bz2)
@@ -65,12 +130,22 @@ shutil.register_unpack_format("zsttar", [".tar.zst"], _unpack_tar_zst)
 shutil.register_unpack_format("zst", [".zst"], _unpack_zst)
 
 
+ARCHIVE_EXTENSIONS = tuple(
+    extension
+    for _, extensions, _ in shutil.get_unpack_formats()
+    for extension in extensions
+)
+
+
 def is_archive_format_supported(archive_path: Path) -> bool:
-    for name, extensions, _ in shutil.get_unpack_formats():
-        for extension in extensions:
-            if archive_path.name.endswith(extension):
-                return True
-    return False
+    return archive_path.name.endswith(ARCHIVE_EXTENSIONS)
+
+
+def _unpack_archive(archive_path: Path, extract_path: str) -> None:
+    if archive_path.name.endswith(TAR_EXTENSIONS):
+        _unpack_tar(str(archive_path), extract_path)
+    else:
+        shutil.unpack_archive(archive_path, extract_path)
 
 
 async def extract_archive(archive_path: Path, extract_path: Path) -> None:
@@ -80,7 +155,7 @@ async def extract_archive(archive_path: Path, extract_path: Path) -> None:
 
     try:
         await asyncio.get_running_loop().run_in_executor(
-            None, shutil.unpack_archive, archive_path, tmp_extract_path
+            None, _unpack_archive, archive_path, tmp_extract_path
         )
     except Exception as e:
         error = f"Failed to extract archive {archive_path}"
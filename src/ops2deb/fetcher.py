@@ -1,6 +1,9 @@
 import asyncio
 import hashlib
+import os
 import shutil
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -15,6 +18,7 @@ from ops2deb.extracter import extract_archive, is_archive_format_supported
 from ops2deb.utils import log_and_raise
 
 DEFAULT_CACHE_DIRECTORY = Path("/tmp/ops2deb_cache")
+HASH_BLOCK_SIZE = 1024 * 1024
 
 
 @dataclass
@@ -39,45 +43,60 @@ class FetchTask:
     expected_sha256: str | None = None
 
 
-async def _download_file(url: str, download_path: Path) -> None:
+async def _download_file(
+    client: httpx.AsyncClient, url: str, download_path: Path
+) -> None:
     tmp_path = f"{download_path}.part"
     logger.info(f"Downloading {download_path.name}...")
     try:
-        async with client_factory() as client:
-            async with client.stream("GET", url) as r:
-                if 400 <= r.status_code < 600:
-                    log_and_raise(
-                        Ops2debFetcherError(
-                            f"Failed to download {url}. "
-                            f"Server responded with {r.status_code}."
-                        )
+        async with client.stream("GET", url) as r:
+            if 400 <= r.status_code < 600:
+                log_and_raise(
+                    Ops2debFetcherError(
+                        f"Failed to download {url}. "
+                        f"Server responded with {r.status_code}."
                     )
-                async with aiofiles.open(tmp_path, "wb") as f:
-                    async for chunk in r.aiter_bytes():
-                        await f.write(chunk)
+                )
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for chunk in r.aiter_bytes():
+                    await f.write(chunk)
     except httpx.HTTPError as e:
         log_and_raise(Ops2debFetcherError(f"Failed to download {url}. {str(e)}"))
     shutil.move(tmp_path, download_path)
 
 
-async def _hash_file(file_path: Path) -> str:
-    logger.info(f"Computing checksum for {file_path.name}...")
-    sha256_hash = hashlib.sha256()
+def _sha256_file(file_path: Path) -> str:
     with file_path.open("rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        if sys.version_info >= (3, 11):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        sha256_hash = hashlib.sha256()
+        for byte_block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
             sha256_hash.update(byte_block)
-            await asyncio.sleep(0)
-    return sha256_hash.hexdigest()
+        return sha256_hash.hexdigest()
+
+
+async def _hash_file(file_path: Path, executor: Executor | None = None) -> str:
+    logger.info(f"Computing checksum for {file_path.name}...")
+    # hashlib releases the GIL, files downloaded in parallel are hashed in parallel
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _sha256_file, file_path)
 
 
 class Fetcher:
-    def __init__(self, cache_directory_path: Path):
+    def __init__(self, cache_directory_path: Path, hash_executor: Executor | None = None):
         self._cache_directory_path = cache_directory_path
+        self._hash_executor = hash_executor
         self._tasks: dict[str, FetchTask] = {}
         self._results: list[FetchResult] = []
         self._failures: list[FetchFailure] = []
 
-    async def _download_hash_extract(self, task: FetchTask) -> None:
+    @property
+    def cache_directory_path(self) -> Path:
+        return self._cache_directory_path
+
+    async def _download_hash_extract(
+        self, client: httpx.AsyncClient, task: FetchTask
+    ) -> None:
         url_hash = hashlib.sha256(task.url.encode()).hexdigest()
         file_name = task.url.split("/")[-1]
         base_path = self._cache_directory_path / url_hash
@@ -87,10 +106,10 @@ class Fetcher:
 
         base_path.mkdir(exist_ok=True, parents=True)
         if download_path.is_file() is False:
-            await _download_file(task.url, download_path)
+            await _download_file(client, task.url, download_path)
 
         if checksum_path.is_file() is False:
-            computed_hash = await _hash_file(download_path)
+            computed_hash = await _hash_file(download_path, self._hash_executor)
             checksum_path.write_text(computed_hash)
         else:
             computed_hash = checksum_path.read_text()
@@ -120,10 +139,11 @@ class Fetcher:
 
     async def _run_task(
         self,
+        client: httpx.AsyncClient,
         task: FetchTask,
     ) -> None:
         try:
-            await self._download_hash_extract(task)
+            await self._download_hash_extract(client, task)
         except Ops2debError as exception:
             for task_data in task.task_datas:
                 self._failures.append(FetchFailure(task.url, exception, task_data))
@@ -132,7 +152,9 @@ class Fetcher:
         if self._tasks:
             logger.title(f"Fetching {len(self._tasks)} files...")
         tasks = self._tasks.values()
-        await asyncio.gather(*[self._run_task(task) for task in tasks])
+        # files are often downloaded from the same hosts, share their connections
+        async with client_factory() as client:
+            await asyncio.gather(*[self._run_task(client, task) for task in tasks])
 
     def add_task(self, url: str, *, data: Any, sha256: str | None = None) -> None:
         task = self._tasks.get(url, FetchTask(url, [], sha256))
@@ -140,7 +162,17 @@ class Fetcher:
         self._tasks[url] = task
 
     def run_tasks(self) -> tuple[list[FetchResult], list[FetchFailure]]:
-        asyncio.run(self._run_tasks())
+        if self._hash_executor is not None:
+            asyncio.run(self._run_tasks())
+        else:
+            # keep the default executor, used by aiofiles to write downloaded chunks,
+            # available while large files are being hashed
+            with ThreadPoolExecutor(os.cpu_count()) as executor:
+                self._hash_executor = executor
+                try:
+                    asyncio.run(self._run_tasks())
+                finally:
+                    self._hash_executor = None
         results = self._results
         self._results = []
         failures = self._failures
@@ -1,5 +1,4 @@
-import json
-from textwrap import wrap
+from textwrap import TextWrapper
 from typing import Any, OrderedDict, Tuple
 
 import yaml
@@ -14,6 +13,8 @@ from ops2deb.parser import (
 )
 from ops2deb.utils import PrettyYAMLDumper
 
+description_wrapper = TextWrapper(width=79)
+
 
 def sort_blueprints(blueprints: list[OrderedDict[str, Any]]) -> list[dict[str, Any]]:
     def key(blueprint: dict[str, Any]) -> Tuple[str, Version, int]:
@@ -21,9 +22,10 @@ def sort_blueprints(blueprints: list[OrderedDict[str, Any]]) -> list[dict[str, A
             version_str = blueprint["matrix"]["versions"][-1]
         except KeyError:
             version_str = blueprint["version"]
-        version: Version = Version(0, 0, 0)
-        if Version.is_valid(version_str):
+        try:
             version = Version.parse(version_str)
+        except ValueError:
+            version = Version(0, 0, 0)
         revision_str = blueprint.get("revision", "1")
         try:
             revision = int(revision_str)
@@ -38,15 +40,15 @@ def format_description(description: str) -> str:
     lines: list[str] = []
     description = description.strip("\n ")
     for line in description.split("\n"):
-        lines.extend(wrap(line, width=79) or [""])
+        lines.extend(description_wrapper.wrap(line) or [""])
     return "\n".join(lines)
 
 
 def format_blueprint(blueprint: dict[str, Any]) -> dict[str, Any]:
     if blueprint_arch := blueprint.pop("arch", None):
         blueprint["architecture"] = blueprint_arch
-    blueprint = json.loads(
-        Blueprint.model_validate(blueprint).model_dump_json(exclude_defaults=True)
+    blueprint = Blueprint.model_validate(blueprint).model_dump(
+        mode="json", exclude_defaults=True
     )
     if (blueprint_fetch := blueprint.get("fetch", None)) and len(blueprint_fetch) == 1:
         blueprint["fetch"] = blueprint_fetch["url"]
@@ -1,4 +1,7 @@
+import errno
+import fcntl
 import logging
+import os
 import shutil
 import subprocess
 from itertools import product
@@ -12,10 +15,39 @@ from ops2deb.exceptions import Ops2debGeneratorError, Ops2debGeneratorScriptErro
 from ops2deb.fetcher import Fetcher, FetchResult
 from ops2deb.parser import Blueprint, HereDocument, Resources, SourceDestinationStr
 from ops2deb.templates import environment
-from ops2deb.utils import working_directory
 
 BASE_TEMPORARY_DIRECTORY = Path("/tmp/ops2deb_tmp")
 
+# ioctl request to share data blocks between two files on btrfs, xfs, ...
+FICLONE = 0x40049409
+
+# source and destination devices between which reflinks are not supported
+_devices_without_reflinks: set[tuple[int, int]] = set()
+
+
+def _copy_file(source: str, destination: str) -> str:
+    if os.path.isdir(destination):
+        destination = os.path.join(destination, os.path.basename(source))
+    devices = (
+        os.stat(source).st_dev,
+        os.stat(os.path.dirname(destination) or ".").st_dev,
+    )
+    if devices in _devices_without_reflinks:
+        return shutil.copy2(source, destination)
+    try:
+        with (
+            open(source, "rb") as source_file,
+            open(destination, "wb") as destination_file,
+        ):
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+    except OSError as e:
+        # filesystem does not support reflinks, don't try again for these devices
+        if e.errno in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY):
+            _devices_without_reflinks.add(devices)
+        return shutil.copy2(source, destination)
+    shutil.copystat(source, destination)
+    return destination
+
 
 def _format_command_output(output: str) -> str:
     lines = output.splitlines()
@@ -40,6 +72,12 @@ class SourcePackage:
         self.temporary_directory = Path("/tmp/ops2deb_tmp") / self.directory_name
         self.fetch_url = blueprint.render_fetch_url()
         self.blueprint = blueprint
+        # if blueprint has no fetch instruction, relative paths in install and script
+        # are relative to the directory where ops2deb config file is, otherwise they
+        # are relative to the fetch directory
+        self.working_directory = (
+            self.fetch_directory if blueprint.fetch else self.configuration_directory
+        )
 
     def _render_template(self, template_name: str) -> None:
         template = environment.get_template(f"{template_name}")
@@ -94,15 +132,21 @@ class SourcePackage:
     def _install_source_destination_str(
         self, entry: SourceDestinationStr, destination: Path
     ) -> None:
-        source = Path(self._render_string(entry.source))
+        source = self.working_directory / self._render_string(entry.source)
         if source.exists() is False:
             raise Ops2debGeneratorError(
                 f"Failed to copy {str(source)}, it does not exist"
             )
         if source.is_dir() is True:
-            shutil.copytree(source, destination, dirs_exist_ok=True, symlinks=True)
+            shutil.copytree(
+                source,
+                destination,
+                dirs_exist_ok=True,
+                symlinks=True,
+                copy_function=_copy_file,
+            )
         elif source.is_file() is True:
-            shutil.copy2(source, destination)
+            _copy_file(str(source), str(destination))
         else:
             raise Ops2debGeneratorError(
                 f"Failed to copy {str(source)}, it is not a file nor a directory"
@@ -130,7 +174,9 @@ class SourcePackage:
         for line in self.blueprint.script:
             line = self._render_string(line)
             logger.info(f"$ {line}")
-            result = subprocess.run(line, shell=True, capture_output=True)
+            result = subprocess.run(
+                line, shell=True, capture_output=True, cwd=self.working_directory
+            )
             if stdout := result.stdout.decode():
                 logger.info(_format_command_output(stdout))
             if stderr := result.stderr.decode():
@@ -160,15 +206,10 @@ class SourcePackage:
         ]:
             self._render_template(template)
 
-        # if blueprint has no fetch instruction, we walk in the directory where ops2deb
-        # config file is, otherwise we run install and script from the fetch directory
-        with working_directory(
-            self.fetch_directory if self.blueprint.fetch else self.configuration_directory
-        ):
-            # copy files / create here documents
-            self._install_files()
-            # run blueprint script
-            self._run_script()
+        # copy files / create here documents
+        self._install_files()
+        # run blueprint script
+        self._run_script()
 
 
 def filter_already_published_packages(
@@ -1,6 +1,7 @@
 import os
+from functools import lru_cache
 
-from jinja2 import Environment
+from jinja2 import Environment, Template
 
 DEFAULT_GOARCH_MAP = {
     "amd64": "amd64",
@@ -28,3 +29,10 @@ filters = {
 environment = Environment()
 environment.globals.update(functions)
 environment.filters.update(filters)
+
+
+@lru_cache(maxsize=4096)
+def compile_template(source: str) -> Template:
+    """The same strings get rendered for every version and architecture of a blueprint,
+    compile them only once"""
+    return environment.from_string(source)
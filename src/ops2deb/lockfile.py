@@ -7,7 +7,13 @@ import yaml
 from pydantic import BaseModel, RootModel, ValidationError
 
 from ops2deb.exceptions import Ops2debLockFileError
-from ops2deb.utils import PrettyYAMLDumper
+from ops2deb.utils import PrettyYAMLDumper, write_text_atomically
+
+try:
+    # libyaml parser is a lot faster, it is missing when PyYAML is built without it
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader  # type: ignore[assignment]
 
 
 class UrlAndHash(Protocol):
@@ -34,12 +40,14 @@ class LockFile:
         self._entries: dict[str, LockEntry] = {}
         self._tainted: bool = False
         self._new_urls: set[str] = set()
+        self._saved_entries: dict[str, LockEntry] = {}
         try:
             if lockfile_path.exists() is True:
                 with lockfile_path.open("r") as reader:
-                    raw_lockfile = yaml.load(reader, yaml.SafeLoader)
+                    raw_lockfile = yaml.load(reader, SafeLoader)
                 lockfile = LockFileModel.model_validate(raw_lockfile).root
                 self._entries.update({entry.url: entry for entry in lockfile})
+                self._saved_entries = dict(self._entries)
         except yaml.YAMLError as e:
             raise Ops2debLockFileError(f"Invalid YAML file.\n{e}")
         except IsADirectoryError:
@@ -83,6 +91,14 @@ class LockFile:
         if not self._entries or self._tainted is False:
             return
 
+        # entries may have been added and removed again since the last save, added
+        # entries are new objects so an identity check is enough to detect changes
+        if self._entries.keys() == self._saved_entries.keys() and all(
+            entry is self._saved_entries[url] for url, entry in self._entries.items()
+        ):
+            self._tainted = False
+            return
+
         # make sure all added urls since lock was created have the same timestamp
         # and make sure this timestamp is when save() was called
         now = get_utc_datetime()
@@ -94,13 +110,12 @@ class LockFile:
         entries = [entry.model_dump() for entry in self._entries.values()]
         sorted_entries = sorted(entries, key=itemgetter("timestamp", "url"))
 
-        with self.lock_file_path.open("w") as output:
-            yaml.dump(
-                sorted_entries,
-                output,
-                Dumper=PrettyYAMLDumper,
-                default_flow_style=False,
-                sort_keys=False,
-                encoding="utf-8",
-            )
+        content = yaml.dump(
+            sorted_entries,
+            Dumper=PrettyYAMLDumper,
+            default_flow_style=False,
+            sort_keys=False,
+        )
+        write_text_atomically(self.lock_file_path, content)
+        self._saved_entries = dict(self._entries)
         self._tainted = False
@@ -1,4 +1,5 @@
 import glob
+import io
 import re
 from dataclasses import dataclass
 from itertools import product
@@ -19,9 +20,9 @@ from pydantic_core import CoreSchema, core_schema
 from ruamel.yaml import YAML, YAMLError  # type: ignore[attr-defined]
 
 from ops2deb.exceptions import Ops2debParserError
-from ops2deb.jinja import DEFAULT_GOARCH_MAP, DEFAULT_RUST_TARGET_MAP, environment
+from ops2deb.jinja import DEFAULT_GOARCH_MAP, DEFAULT_RUST_TARGET_MAP, compile_template
 from ops2deb.lockfile import LockFile
-from ops2deb.utils import FixIndentEmitter
+from ops2deb.utils import FixIndentEmitter, write_text_atomically
 
 Architecture = Literal["all", "amd64", "arm64", "armhf"]
 
@@ -174,7 +175,7 @@ class Blueprint(Base):
         for string in "name", "version", "summary", "description", "homepage":
             value = getattr(blueprint, string, None)
             if isinstance(value, str):
-                setattr(blueprint, string, environment.from_string(value).render())
+                setattr(blueprint, string, compile_template(value).render())
         return blueprint
 
     def architectures(self) -> list[str]:
@@ -192,7 +193,7 @@ class Blueprint(Base):
         architecture = architecture or self.architecture
         version: Any = kwargs.pop("version", None)
         version = version or self.version
-        return environment.from_string(string).render(
+        return compile_template(string).render(
             name=self.name,
             arch=architecture,
             version=version,
@@ -248,8 +249,8 @@ def load_configuration_file(configuration_path: Path) -> ConfigurationFile:
     yaml.Emitter = FixIndentEmitter
 
     try:
-        with configuration_path.open("r") as fd:
-            content = yaml.load(fd)
+        text = configuration_path.read_text()
+        content = yaml.load(text)
     except YAMLError as e:
         raise Ops2debParserError(f"Failed to parse {configuration_path}.\n{e}")
     except FileNotFoundError:
@@ -259,10 +260,9 @@ def load_configuration_file(configuration_path: Path) -> ConfigurationFile:
 
     # configuration file can start with "# lockfile={path_to_lockfile}"
     lockfile_path = get_default_lockfile_path(configuration_path)
-    with configuration_path.open() as file:
-        first_line = file.readline().strip()
-        if (match := LOCKFILE_PATH_HEADER_RE.match(first_line)) is not None:
-            lockfile_path = (configuration_path.parent / match.group(1)).absolute()
+    first_line = text.split("\n", 1)[0].strip()
+    if (match := LOCKFILE_PATH_HEADER_RE.match(first_line)) is not None:
+        lockfile_path = (configuration_path.parent / match.group(1)).absolute()
 
     raw_blueprints = content if isinstance(content, list) else [content]
 
@@ -291,8 +291,10 @@ def load_configuration_file(configuration_path: Path) -> ConfigurationFile:
 def save_configuration_file(configuration_file: ConfigurationFile) -> None:
     if configuration_file.tainted is False:
         return
-    with configuration_file.path.open("w") as output:
-        configuration_file.yaml.dump(configuration_file.content, output)
+    # serialize in memory first so that a failing dump can't truncate the file
+    output = io.StringIO()
+    configuration_file.yaml.dump(configuration_file.content, output)
+    write_text_atomically(configuration_file.path, output.getvalue())
 
 
 def load_configuration_files(
@@ -68,4 +68,5 @@ def template_loader(name: str) -> Optional[str]:
     return None
 
 
-environment = Environment(loader=FunctionLoader(template_loader))
+# templates are module constants, compiled templates never need to be reloaded
+environment = Environment(loader=FunctionLoader(template_loader), auto_reload=False)
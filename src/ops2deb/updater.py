@@ -1,10 +1,17 @@
 import asyncio
+import hashlib
+import json
 import os
 import re
+import time
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Tuple, cast
+from typing import Any, AsyncIterator, OrderedDict, Tuple, cast
+from urllib.parse import urlsplit
 
+import aiofiles
 import httpx
 from semver.version import Version
 
@@ -14,10 +21,113 @@ from ops2deb.exceptions import Ops2debError, Ops2debUpdaterError
 from ops2deb.fetcher import Fetcher
 from ops2deb.parser import Blueprint, Resources
 
+try:
+    # github API responses can be large, orjson parses them a lot faster
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads  # type: ignore[assignment, unused-ignore]
+
+MAX_CONCURRENT_LOOKUPS = 64
+MAX_CONCURRENT_REQUESTS_PER_HOST = 8
+MAX_REQUESTS_PER_SECOND_PER_HOST = 80.0
+
+VERSION_PARTS = ["major", "minor", "patch"]
+
+SEMVER_RE = re.compile(r"^(\d+)\.(\d+)\.(\d+)(?:[-+].*)?$")
+
+
+def _semver_key(version: str) -> tuple[int, int, int] | None:
+    if (match := SEMVER_RE.match(version)) is None:
+        return None
+    return int(match[1]), int(match[2]), int(match[3])
+
+
+@lru_cache(maxsize=2048)
+def _parse_version(version: str) -> Version:
+    # blueprint versions are parsed both to select and to run the update strategy
+    return Version.parse(version)
+
+
+def _bump_version(version: Version, version_part: str, n: int) -> Version:
+    """Equivalent to calling version.bump_{version_part}() n times"""
+    if version_part == "major":
+        return Version(version.major + n)
+    if version_part == "minor":
+        return Version(version.major, version.minor + n)
+    return Version(version.major, version.minor, version.patch + n)
+
+
+class TokenBucket:
+    """Allows bursts of up to `rate` requests, then `rate` requests per second"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                elapsed, self._updated_at = now - self._updated_at, now
+                self._tokens = min(self.rate, self._tokens + elapsed * self.rate)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostLimiter:
+    """
+    Limits the number and the rate of simultaneous requests sent to the same host,
+    and remembers hosts that refuse HEAD requests.
+    """
+
+    def __init__(
+        self,
+        max_requests_per_host: int = MAX_CONCURRENT_REQUESTS_PER_HOST,
+        max_requests_per_second: float = MAX_REQUESTS_PER_SECOND_PER_HOST,
+    ):
+        self.max_requests_per_host = max_requests_per_host
+        self.max_requests_per_second = max_requests_per_second
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self.hosts_refusing_head: set[str] = set()
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        host = urlsplit(url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_requests_per_host)
+            self._semaphores[host] = semaphore
+            self._buckets[host] = TokenBucket(self.max_requests_per_second)
+        async with semaphore:
+            await self._buckets[host].acquire()
+            yield
+
 
 class BaseUpdateStrategy:
-    def __init__(self, client: httpx.AsyncClient):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        limiter: HostLimiter | None = None,
+    ):
         self.client = client
+        self.limiter = limiter or HostLimiter()
+        self._fetch_urls: dict[tuple[int, str | None], tuple[Blueprint, str | None]] = {}
+
+    def _render_fetch_url(
+        self, blueprint: Blueprint, version: str | None = None
+    ) -> str | None:
+        # probing versions renders the same urls over and over, blueprint is kept in
+        # the cache entry so that its id can't be reused by another blueprint
+        key = (id(blueprint), version)
+        if (entry := self._fetch_urls.get(key)) is None or entry[0] is not blueprint:
+            entry = (blueprint, blueprint.render_fetch_url(version=version))
+            self._fetch_urls[key] = entry
+        return entry[1]
 
     async def try_version(self, blueprint: Blueprint, version: str) -> bool:
         # No need to waste an HTTP call when called with the current blueprint version
@@ -25,13 +135,14 @@ class BaseUpdateStrategy:
             return True
 
         # Fetch url does not depend on blueprint version or blueprint has no fetch
-        url = blueprint.render_fetch_url(version=version)
-        if url == blueprint.render_fetch_url() or url is None:
+        url = self._render_fetch_url(blueprint, version)
+        if url == self._render_fetch_url(blueprint) or url is None:
             return False
 
         logger.debug(f"{self.__class__.__name__} - {blueprint.name} - Trying {url}")
         try:
-            response = await self.client.head(url)
+            async with self.limiter.limit(url):
+                response = await self._head(url)
         except httpx.HTTPError as e:
             raise Ops2debUpdaterError(f"Failed HEAD request to {url}. {str(e)}")
         status = response.status_code
@@ -41,6 +152,23 @@ class BaseUpdateStrategy:
             return False
         return True
 
+    async def _head(self, url: str) -> httpx.Response:
+        # some servers answer HEAD requests with a 405 but serve GET requests, fall
+        # back to a GET of the first byte and stop sending HEADs to those hosts. A 403
+        # is how S3 like hosts answer for missing objects, it is not retried
+        host = urlsplit(url).netloc
+        if host not in self.limiter.hosts_refusing_head:
+            response = await self.client.head(url)
+            if response.status_code != 405:
+                return response
+        headers = {"range": "bytes=0-0"}
+        # the body is not read in case the server ignores the range header
+        async with self.client.stream("GET", url, headers=headers) as response:
+            pass
+        if response.status_code < 400:
+            self.limiter.hosts_refusing_head.add(host)
+        return response
+
     @classmethod
     def is_blueprint_supported(cls, blueprint: Blueprint) -> bool:
         raise NotImplementedError
@@ -55,14 +183,64 @@ class GenericUpdateStrategy(BaseUpdateStrategy):
     replies with something else than a 404. More or less a brute force approach.
     """
 
+    exponential_probes = 6
+    max_probes = 32
+
     async def _try_a_few_patches(
         self, blueprint: Blueprint, version: Version
     ) -> Version | None:
-        for i in range(0, 3):
-            version = version.bump_patch()
-            if await self.try_version(blueprint, str(version)) is True:
-                return version
-        return None
+        candidates = [_bump_version(version, "patch", n) for n in range(1, 4)]
+        results = await asyncio.gather(
+            *[self.try_version(blueprint, str(candidate)) for candidate in candidates]
+        )
+        found = [candidate for candidate, result in zip(candidates, results) if result]
+        return max(found) if found else None
+
+    async def _probe_exponential(
+        self, blueprint: Blueprint, version: Version, version_part: str
+    ) -> tuple[Version, int]:
+        # most blueprints are up to date, only try 2, 4, 8, ... bumps at once when
+        # the next version exists, then binary search the gap between the highest
+        # bump that exists and the next one
+        if not await self.try_version(
+            blueprint, str(_bump_version(version, version_part, 1))
+        ):
+            return version, 1
+        steps = [2**i for i in range(1, self.exponential_probes)]
+        results = await asyncio.gather(
+            *[
+                self.try_version(blueprint, str(_bump_version(version, version_part, n)))
+                for n in steps
+            ]
+        )
+        probes = 1 + len(steps)
+        low = max([1] + [n for n, found in zip(steps, results) if found])
+        high = low * 2
+        if low == steps[-1]:
+            # every step exists, keep doubling until a bumped version is missing
+            while True:
+                if probes >= self.max_probes:
+                    logger.warning(
+                        f"{self.__class__.__name__} - {blueprint.name} - Gave up "
+                        f"looking for {version_part} releases after {probes} requests"
+                    )
+                    return _bump_version(version, version_part, low), probes
+                probes += 1
+                if not await self.try_version(
+                    blueprint, str(_bump_version(version, version_part, high))
+                ):
+                    break
+                low, high = high, high * 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            probes += 1
+            if await self.try_version(
+                blueprint, str(_bump_version(version, version_part, middle))
+            ):
+                low = middle
+            else:
+                high = middle
+        return _bump_version(version, version_part, low), probes
 
     async def _try_versions(
         self,
@@ -70,72 +248,293 @@ class GenericUpdateStrategy(BaseUpdateStrategy):
         version: Version,
         version_part: str,
     ) -> Version:
-        bumped_version = getattr(version, f"bump_{version_part}")()
-        if await self.try_version(blueprint, str(bumped_version)) is False:
-            if version_part != "patch":
-                if (
-                    result := await self._try_a_few_patches(blueprint, bumped_version)
-                ) is not None:
-                    return await self._try_versions(blueprint, result, version_part)
-                else:
-                    return version
-            else:
-                return version
-        else:
-            return await self._try_versions(blueprint, bumped_version, version_part)
+        probes = 0
+        while probes < self.max_probes:
+            version, count = await self._probe_exponential(
+                blueprint, version, version_part
+            )
+            probes += count
+            if version_part == "patch":
+                break
+            # next version does not exist, maybe a patch release of it does
+            bumped_version = _bump_version(version, version_part, 1)
+            result = await self._try_a_few_patches(blueprint, bumped_version)
+            probes += 3
+            if result is None:
+                break
+            version = result
+        return version
 
     @classmethod
     def is_blueprint_supported(cls, blueprint: Blueprint) -> bool:
-        if not Version.is_valid(blueprint.version):
+        try:
+            _parse_version(blueprint.version)
+        except ValueError:
             logger.warning(f"{blueprint.name} is not using semantic versioning")
             return False
         return True
 
-    async def __call__(self, blueprint: Blueprint) -> str:
-        current_version = version = Version.parse(blueprint.version)
+    async def _try_minor_and_patch_versions(
+        self, blueprint: Blueprint, version: Version
+    ) -> Version:
         for version_part in ["minor", "patch"]:
             version = await self._try_versions(blueprint, version, version_part)
+        return version
+
+    async def __call__(self, blueprint: Blueprint) -> str:
+        current_version = _parse_version(blueprint.version)
+        # no need to probe anything when no bumped version changes the fetch url,
+        # urls may only depend on the major or on the major and minor parts
+        url = self._render_fetch_url(blueprint)
+        bumped_versions = [_bump_version(current_version, p, 1) for p in VERSION_PARTS]
+        if all(url == self._render_fetch_url(blueprint, str(v)) for v in bumped_versions):
+            return blueprint.version
+        # major releases are only used when there is no new minor or patch release,
+        # they are probed speculatively at the same time to save round trips
+        version, major_version = await asyncio.gather(
+            self._try_minor_and_patch_versions(blueprint, current_version),
+            self._try_versions(blueprint, current_version, "major"),
+            return_exceptions=True,
+        )
+        if isinstance(version, BaseException):
+            raise version
         if version == current_version:
-            version = await self._try_versions(blueprint, version, "major")
+            if isinstance(major_version, BaseException):
+                raise major_version
+            version = major_version
         return str(version)
 
 
+GITHUB_URL_RE = re.compile(r"^https://github.com/(?P<owner>[\w-]+)/(?P<name>[\w-]+)/")
+
+
+@lru_cache(maxsize=1024)
+def _parse_github_url(url: str) -> tuple[str, str] | None:
+    # called for each github blueprint when prefetching releases and again when
+    # selecting and running the update strategy
+    if (match := GITHUB_URL_RE.match(url)) is None:
+        return None
+    return match["owner"], match["name"]
+
+
+class GithubTokenPool:
+    """
+    Spreads Github API requests over several tokens, tokens whose rate limit is
+    exhausted are skipped until their rate limit is reset.
+    """
+
+    def __init__(self, tokens: list[str]):
+        self.tokens = tokens
+        self._index = 0
+        self._reset_at: dict[str, float] = {}
+
+    def get(self) -> str | None:
+        now = time.time()
+        for _ in range(len(self.tokens)):
+            token = self.tokens[self._index]
+            self._index = (self._index + 1) % len(self.tokens)
+            if self._reset_at.get(token, 0) <= now:
+                return token
+        return None
+
+    def update(self, token: str | None, response: httpx.Response) -> None:
+        if token is None or response.headers.get("x-ratelimit-remaining") != "0":
+            return
+        try:
+            self._reset_at[token] = float(response.headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            self._reset_at[token] = time.time() + 60
+
+
 class GithubUpdateStrategy(BaseUpdateStrategy):
     """Uses Github release API to find the latest release."""
 
-    github_url_re = r"^https://github.com/(?P<owner>[\w-]+)/(?P<name>[\w-]+)/"
     github_media_type = "application/vnd.github.v3+json"
     github_base_api_url = "https://api.github.com"
     github_token_env_variable = "OPS2DEB_GITHUB_TOKEN"
+    github_tokens_env_variable = "OPS2DEB_GITHUB_TOKENS"
+
+    github_graphql_batch_size = 100
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        cache_directory: Path | None = None,
+        latest_releases: dict[tuple[str, str], dict[str, Any]] | None = None,
+        limiter: HostLimiter | None = None,
+        tokens: GithubTokenPool | None = None,
+        pending_releases: dict[tuple[str, str], asyncio.Task[dict[str, Any]]]
+        | None = None,
+    ):
+        super().__init__(client, limiter)
+        self.cache_directory = cache_directory
+        self.latest_releases = latest_releases or {}
+        # blueprints packaging different tools of the same repository share requests
+        self.pending_releases = pending_releases if pending_releases is not None else {}
+        self.tokens = tokens or self.get_token_pool()
+        self.headers = {"accept": self.github_media_type}
 
     @classmethod
-    def _get_github_repo_api_base_url(cls, blueprint: Blueprint) -> str:
+    def get_token_pool(cls) -> GithubTokenPool:
+        tokens = os.environ.get(cls.github_tokens_env_variable, "").split(",")
+        tokens.append(os.environ.get(cls.github_token_env_variable, ""))
+        return GithubTokenPool(
+            list(dict.fromkeys(t.strip() for t in tokens if t.strip()))
+        )
+
+    @classmethod
+    def _get_github_repo(cls, blueprint: Blueprint) -> tuple[str, str]:
         if (url := blueprint.render_fetch_url()) is None:
             raise ValueError(f"Blueprint {blueprint.name} has no fetch instruction")
-        if (match := re.match(cls.github_url_re, url)) is None:
+        if (repository := _parse_github_url(url)) is None:
             raise ValueError(f"URL {url} is not supported")
-        return f"{cls.github_base_api_url}/repos/{match['owner']}/{match['name']}"
+        return repository
+
+    @classmethod
+    def _get_github_repo_api_base_url(cls, blueprint: Blueprint) -> str:
+        owner, name = cls._get_github_repo(blueprint)
+        return f"{cls.github_base_api_url}/repos/{owner}/{name}"
 
-    async def _get_latest_github_release(self, blueprint: Blueprint) -> dict[str, str]:
+    @classmethod
+    async def _get_latest_github_releases_batch(
+        cls,
+        client: httpx.AsyncClient,
+        repositories: list[tuple[str, str]],
+        tokens: GithubTokenPool,
+    ) -> dict[tuple[str, str], dict[str, Any]]:
+        if (token := tokens.get()) is None:
+            return {}
+        queries = [
+            f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) "
+            "{ latestRelease { tagName "
+            "releaseAssets(first: 100) { nodes { downloadUrl } } } }"
+            for i, (owner, name) in enumerate(repositories)
+        ]
+        try:
+            response = await client.post(
+                f"{cls.github_base_api_url}/graphql",
+                json={"query": f"query {{ {' '.join(queries)} }}"},
+                headers={"authorization": f"bearer {token}"},
+            )
+            tokens.update(token, response)
+            response.raise_for_status()
+            data = json_loads(response.content).get("data") or {}
+        except (httpx.HTTPError, ValueError) as e:
+            logger.debug(f"{cls.__name__} - Failed to request Github GraphQL API. {e}")
+            return {}
+        releases: dict[tuple[str, str], dict[str, Any]] = {}
+        for i, repository in enumerate(repositories):
+            if (release := (data.get(f"r{i}") or {}).get("latestRelease")) is None:
+                continue
+            assets = (release.get("releaseAssets") or {}).get("nodes") or []
+            releases[repository] = {
+                "tag_name": release["tagName"],
+                "assets": [{"browser_download_url": a["downloadUrl"]} for a in assets],
+            }
+        return releases
+
+    @classmethod
+    async def get_latest_github_releases(
+        cls,
+        client: httpx.AsyncClient,
+        blueprints: list[Blueprint],
+        tokens: GithubTokenPool | None = None,
+    ) -> dict[tuple[str, str], dict[str, Any]]:
+        """
+        Find latest releases of Github hosted blueprints with the GraphQL API, which
+        resolves many repositories in a single request. The GraphQL API requires a
+        token, without one releases are looked up with the REST API, one at a time.
+        """
+        if not (tokens := tokens or cls.get_token_pool()).tokens:
+            return {}
+        unique_repositories: set[tuple[str, str]] = set()
+        for blueprint in blueprints:
+            try:
+                unique_repositories.add(cls._get_github_repo(blueprint))
+            except ValueError:
+                continue
+        repositories, size = sorted(unique_repositories), cls.github_graphql_batch_size
+        batches = [repositories[i : i + size] for i in range(0, len(repositories), size)]
+        releases: dict[tuple[str, str], dict[str, Any]] = {}
+        for result in await asyncio.gather(
+            *[cls._get_latest_github_releases_batch(client, b, tokens) for b in batches]
+        ):
+            releases.update(result)
+        return releases
+
+    def _get_release_cache_path(self, repo_api_base_url: str) -> Path | None:
+        if self.cache_directory is None:
+            return None
+        url_hash = hashlib.sha256(repo_api_base_url.encode()).hexdigest()
+        return self.cache_directory / "github" / f"{url_hash}.json"
+
+    @staticmethod
+    async def _read_cached_release(cache_path: Path) -> dict[str, Any] | None:
+        try:
+            async with aiofiles.open(cache_path, "r") as f:
+                return cast(dict[str, Any], json_loads(await f.read()))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    async def _write_cached_release(cache_path: Path, cache: dict[str, Any]) -> None:
+        try:
+            cache_path.parent.mkdir(exist_ok=True, parents=True)
+            async with aiofiles.open(cache_path, "w") as f:
+                await f.write(json.dumps(cache))
+        except OSError as e:
+            logger.debug(f"Failed to write Github API cache {cache_path}. {e}")
+
+    async def _get_latest_github_release(self, blueprint: Blueprint) -> dict[str, Any]:
+        repository = self._get_github_repo(blueprint)
+        if release := self.latest_releases.get(repository):
+            return release
+        if (task := self.pending_releases.get(repository)) is None:
+            task = asyncio.create_task(self._request_latest_github_release(blueprint))
+            self.pending_releases[repository] = task
+        return await task
+
+    async def _request_latest_github_release(
+        self, blueprint: Blueprint
+    ) -> dict[str, Any]:
         repo_api_base_url = self._get_github_repo_api_base_url(blueprint)
-        headers = {"accept": self.github_media_type}
-        token = os.environ.get(GithubUpdateStrategy.github_token_env_variable)
-        if token is not None:
+        headers = self.headers.copy()
+        if (token := self.tokens.get()) is not None:
             headers["authorization"] = f"token {token}"
+
+        # conditional requests answered with a 304 don't count against the rate limit
+        cached: dict[str, Any] | None = None
+        if (cache_path := self._get_release_cache_path(repo_api_base_url)) is not None:
+            if (cached := await self._read_cached_release(cache_path)) is not None:
+                if etag := cached.get("etag"):
+                    headers["if-none-match"] = etag
+                if last_modified := cached.get("last_modified"):
+                    headers["if-modified-since"] = last_modified
+
+        url = f"{repo_api_base_url}/releases/latest"
         try:
-            response = await self.client.get(
-                f"{repo_api_base_url}/releases/latest", headers=headers
-            )
+            async with self.limiter.limit(url):
+                response = await self.client.get(url, headers=headers)
         except httpx.HTTPError as e:
             raise Ops2debUpdaterError(f"Failed to request Github API. {e}")
+        self.tokens.update(token, response)
+        if response.status_code == 304 and cached is not None:
+            logger.debug(f"{self.__class__.__name__} - {blueprint.name} - Not modified")
+            return cast(dict[str, Any], cached["release"])
         if response.status_code != 200:
             error = f"Failed to request Github API. Error {response.status_code}."
             try:
-                error += f" {response.json()['message']}."
+                error += f" {json_loads(response.content)['message']}."
             except Exception:
                 pass
             raise Ops2debUpdaterError(error)
-        return cast(dict[str, Any], response.json())
+        release = cast(dict[str, Any], json_loads(response.content))
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if cache_path is not None and (etag or last_modified):
+            cache = dict(etag=etag, last_modified=last_modified, release=release)
+            await self._write_cached_release(cache_path, cache)
+        return release
 
     @classmethod
     def is_blueprint_supported(cls, blueprint: Blueprint) -> bool:
@@ -145,15 +544,31 @@ class GithubUpdateStrategy(BaseUpdateStrategy):
         except ValueError:
             return False
 
+    def _is_release_asset(
+        self, blueprint: Blueprint, release: dict[str, Any], version: str
+    ) -> bool:
+        # assets listed by the API exist, no need to confirm them with a HEAD request
+        if version == blueprint.version:
+            return False
+        url = self._render_fetch_url(blueprint, version)
+        if url is None or url == self._render_fetch_url(blueprint):
+            return False
+        assets = release.get("assets") or []
+        return any(asset.get("browser_download_url") == url for asset in assets)
+
     async def __call__(self, blueprint: Blueprint) -> str:
         latest_release = await self._get_latest_github_release(blueprint)
         if (tag_name := latest_release.get("tag_name")) is None:
             raise Ops2debUpdaterError("Failed to determine latest release version")
-        version = tag_name
+        version: str = tag_name
         if matches := re.findall(r"\d+\.\d+\.\d+", tag_name):
             version = matches[0]
-        if Version.is_valid(version) and Version.is_valid(blueprint.version):
-            version = str(max(Version.parse(version), Version.parse(blueprint.version)))
+        # prerelease and build metadata are ignored, on equality the tag version wins
+        new_key, current_key = _semver_key(version), _semver_key(blueprint.version)
+        if new_key is not None and current_key is not None and current_key > new_key:
+            version = blueprint.version
+        if self._is_release_asset(blueprint, latest_release, version):
+            return version
         if await self.try_version(blueprint, version) is False:
             raise Ops2debUpdaterError(
                 f"Failed to determine latest release URL (latest tag is {tag_name})"
@@ -167,10 +582,67 @@ class LatestRelease:
     version: str
 
 
+class UpToDateCache:
+    """
+    Remembers when blueprints were last found up to date, so that frequent update
+    runs (cron, CI) don't look for new releases of the same blueprint version again
+    before the cache entry expires.
+    """
+
+    def __init__(self, path: Path, ttl: int):
+        self.path = path
+        self.ttl = ttl
+        self._entries: dict[str, dict[str, float]] = {}
+        if ttl <= 0:
+            return
+        try:
+            self._entries = json.loads(path.read_text())
+        except (OSError, ValueError):
+            pass
+
+    def is_up_to_date(self, blueprint: Blueprint) -> bool:
+        checked_at = self._entries.get(blueprint.name, {}).get(blueprint.version)
+        return checked_at is not None and checked_at + self.ttl > time.time()
+
+    def add(self, blueprint: Blueprint) -> None:
+        self._entries.setdefault(blueprint.name, {})[blueprint.version] = time.time()
+
+    def save(self) -> None:
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        entries = {
+            name: versions
+            for name, all_versions in self._entries.items()
+            if (versions := {v: t for v, t in all_versions.items() if t + self.ttl > now})
+        }
+        try:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            self.path.write_text(json.dumps(entries))
+        except OSError as e:
+            logger.debug(f"Failed to write update cache {self.path}. {e}")
+
+
 async def _find_latest_version(
-    client: httpx.AsyncClient, blueprint: Blueprint
+    client: httpx.AsyncClient,
+    blueprint: Blueprint,
+    cache_directory: Path | None,
+    github_releases: dict[tuple[str, str], dict[str, Any]],
+    limiter: HostLimiter,
+    tokens: GithubTokenPool,
+    pending_releases: dict[tuple[str, str], asyncio.Task[dict[str, Any]]],
 ) -> LatestRelease | None:
-    strategies = [GithubUpdateStrategy(client), GenericUpdateStrategy(client)]
+    strategies = [
+        GithubUpdateStrategy(
+            client,
+            cache_directory,
+            github_releases,
+            limiter,
+            tokens,
+            pending_releases,
+        ),
+        GenericUpdateStrategy(client, limiter),
+    ]
     strategies = [u for u in strategies if u.is_blueprint_supported(blueprint)]
     if not strategies:
         return None
@@ -196,17 +668,48 @@ async def _find_latest_version(
 
 async def _find_latest_versions(
     blueprints: list[Blueprint],
+    cache_directory: Path | None = None,
+    up_to_date_cache: UpToDateCache | None = None,
 ) -> tuple[list[LatestRelease], list[Ops2debError]]:
+    async def _find_latest_version_bounded(
+        sem: asyncio.Semaphore, client: httpx.AsyncClient, blueprint: Blueprint
+    ) -> LatestRelease | None:
+        async with sem:  # semaphore limits num of simultaneous lookups
+            return await _find_latest_version(
+                client,
+                blueprint,
+                cache_directory,
+                github_releases,
+                limiter,
+                tokens,
+                pending_releases,
+            )
+
+    sem = asyncio.Semaphore(MAX_CONCURRENT_LOOKUPS)
+    limiter = HostLimiter()
+    tokens = GithubUpdateStrategy.get_token_pool()
+    pending_releases: dict[tuple[str, str], asyncio.Task[dict[str, Any]]] = {}
     async with client_factory() as client:
-        tasks = [_find_latest_version(client, b) for b in blueprints]
+        github_releases = await GithubUpdateStrategy.get_latest_github_releases(
+            client, blueprints, tokens
+        )
+        # lookups are scheduled right away, gather takes tasks as is
+        tasks = [
+            asyncio.create_task(_find_latest_version_bounded(sem, client, b))
+            for b in blueprints
+        ]
         tasks_results = await asyncio.gather(*tasks, return_exceptions=True)
         releases: list[LatestRelease] = []
         errors: list[Ops2debError] = []
-        for result in tasks_results:
-            if isinstance(result, Ops2debError):
-                errors.append(result)
-            elif isinstance(result, LatestRelease):
+        for blueprint, result in zip(blueprints, tasks_results):
+            if isinstance(result, LatestRelease):
                 releases.append(result)
+            elif isinstance(result, Ops2debError):
+                errors.append(result)
+            elif isinstance(result, BaseException):
+                raise result
+            elif up_to_date_cache is not None:
+                up_to_date_cache.add(blueprint)
     return releases, errors
 
 
@@ -215,22 +718,32 @@ def find_latest_releases(
     fetcher: Fetcher,
     skip_names: list[str] | None,
     only_names: list[str] | None,
+    cache_ttl: int = 0,
 ) -> Tuple[list[LatestRelease], list[Ops2debError]]:
-    blueprints = [b for b in resources.blueprints if b.fetch is not None]
-    if skip_names:
-        blueprints = [b for b in blueprints if b.name not in skip_names]
-    if only_names:
-        blueprints = [b for b in blueprints if b.name in only_names]
+    skipped_names = set(skip_names or [])
+    selected_names = set(only_names or [])
 
     # when multiple blueprints have the same name, only look for new releases for the
     # last one in the list
     blueprints_by_name: dict[str, Blueprint] = {}
-    for blueprint in blueprints:
+    for blueprint in resources.blueprints:
+        if blueprint.fetch is None or blueprint.name in skipped_names:
+            continue
+        if selected_names and blueprint.name not in selected_names:
+            continue
         blueprints_by_name[blueprint.name] = blueprint
     blueprints = list(blueprints_by_name.values())
 
+    # skip blueprints recently found up to date
+    cache_path = fetcher.cache_directory_path / "up_to_date.json"
+    up_to_date_cache = UpToDateCache(cache_path, cache_ttl)
+    blueprints = [b for b in blueprints if not up_to_date_cache.is_up_to_date(b)]
+
     # find new releases for the selected list of blueprints
-    releases, errors = asyncio.run(_find_latest_versions(blueprints))
+    releases, errors = asyncio.run(
+        _find_latest_versions(blueprints, fetcher.cache_directory_path, up_to_date_cache)
+    )
+    up_to_date_cache.save()
 
     # download new files
     releases_by_id: dict[int, LatestRelease] = {}
@@ -251,7 +764,14 @@ def find_latest_releases(
             lock = resources.get_blueprint_lock(a_release.blueprint)
             lock.add([result])
 
-    return releases, list([failure.error for failure in failures]) + list(errors)
+    return releases, [failure.error for failure in failures] + errors
+
+
+def _move_keys_to_front(raw_blueprint: OrderedDict[str, Any], keys: list[str]) -> None:
+    # move_to_end is O(1) and, unlike rebuilding the mapping, keeps ruamel comments
+    for key in reversed(keys):
+        if key in raw_blueprint:
+            raw_blueprint.move_to_end(key, last=False)
 
 
 def _update_configuration(
@@ -271,10 +791,7 @@ def _update_configuration(
             removed_versions = [raw_blueprint["version"]]
         raw_blueprint["version"] = release.version
         raw_blueprint.pop("revision", None)
-        raw_blueprint.move_to_end("version", last=False)
-        if "matrix" in raw_blueprint:
-            raw_blueprint.move_to_end("matrix", last=False)
-        raw_blueprint.move_to_end("name", last=False)
+        _move_keys_to_front(raw_blueprint, ["name", "matrix", "version"])
     else:
         if (count := len(release.blueprint.versions())) - max_versions >= 0:
             versions = raw_blueprint["matrix"]["versions"]
@@ -282,8 +799,7 @@ def _update_configuration(
             removed_versions = versions[: count - max_versions + 1]
         if "matrix" not in raw_blueprint:
             raw_blueprint["matrix"] = {}
-            raw_blueprint.move_to_end("matrix", last=False)
-            raw_blueprint.move_to_end("name", last=False)
+            _move_keys_to_front(raw_blueprint, ["name", "matrix"])
         if "versions" not in raw_blueprint["matrix"]:
             raw_blueprint["matrix"]["versions"] = [release.blueprint.version]
         raw_blueprint["matrix"]["versions"].append(release.version)
@@ -291,33 +807,25 @@ def _update_configuration(
     return removed_versions
 
 
-def _remove_versions_from_lockfile(
-    configuration: Resources, release: LatestRelease, removed_versions: list[str]
-) -> None:
-    blueprint = release.blueprint
-    lock = configuration.get_blueprint_lock(blueprint)
-    for version in removed_versions:
-        lock.remove(blueprint.render_fetch_urls(version))
-
-
 def _update_configurations(
     resources: Resources, max_versions: int, releases: list[LatestRelease]
 ) -> list[str]:
     summary: list[str] = []
 
     for release in releases:
+        blueprint = release.blueprint
         removed_versions = _update_configuration(resources, release, max_versions)
         if max_versions == 1:
-            lines = [
-                f"Update {release.blueprint.name} from "
-                f"v{release.blueprint.version} to v{release.version}"
-            ]
+            summary.append(
+                f"Update {blueprint.name} from v{blueprint.version} to v{release.version}"
+            )
         else:
-            lines = [f"Add {release.blueprint.name} v{release.version}"]
+            summary.append(f"Add {blueprint.name} v{release.version}")
             for version in removed_versions:
-                lines.append(f"Remove {release.blueprint.name} v{version}")
-        _remove_versions_from_lockfile(resources, release, removed_versions)
-        summary.extend(lines)
+                summary.append(f"Remove {blueprint.name} v{version}")
+        lock = resources.get_blueprint_lock(blueprint)
+        for version in removed_versions:
+            lock.remove(blueprint.render_fetch_urls(version))
 
     return summary
 
@@ -330,9 +838,12 @@ def update(
     skip_names: list[str] | None = None,
     only_names: list[str] | None = None,
     max_versions: int = 1,
+    cache_ttl: int = 0,
 ) -> None:
     logger.title("Looking for new releases...")
-    releases, errors = find_latest_releases(resources, fetcher, skip_names, only_names)
+    releases, errors = find_latest_releases(
+        resources, fetcher, skip_names, only_names, cache_ttl
+    )
 
     summary = _update_configurations(resources, max_versions, releases)
 
@@ -1,7 +1,9 @@
 import os
-from contextlib import contextmanager
+import stat
+import tempfile
+from contextlib import suppress
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any
 
 import yaml
 from ruamel.yaml.emitter import Emitter
@@ -14,14 +16,25 @@ def log_and_raise(exception: Exception) -> None:
     raise exception
 
 
-@contextmanager
-def working_directory(path: Path) -> Iterator[None]:
-    origin = Path().absolute()
+def write_text_atomically(path: Path, content: str) -> None:
+    """Write to a temporary file first so that readers never see a partial file"""
+    path = Path(os.path.realpath(path))
     try:
-        os.chdir(path)
-        yield
-    finally:
-        os.chdir(origin)
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as output:
+            output.write(content)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
 
 
 class PrettyYAMLDumper(yaml.dumper.SafeDumper):
@@ -87,9 +87,23 @@ async def serve_snapshot_apt_secops_binary_amd64_packages():
     return PlainTextResponse(content=dedent(snapshot_apt_secops_binary_amd64_packages))
 
 
+# files served by the mock server are decoded once, not on every request
+DANGLING_SYMLINK_TAR_XZ = base64.b64decode(
+    b"""/Td6WFoAAATm1rRGAgAhARYAAAB0L+Wj4AX/AGFdADIYSiE4i4ddgZh67LcVqfV6kAa92oeZZszM
+    2Tg8AMYeZqxKzl9Ypxd5dz3hYKZmYWYxihSJZAW6R+XAe2ce+dJboUIlwezUAwemw+f4mQVxSk0S
+    tLV2svttG83alyZFRFwAAAAALhYEWE9UVL0AAX2ADAAAAOjF2Y+xxGf7AgAAAAAEWVo="""
+)
+GREAT_APP_TAR_GZ = base64.b64decode(
+    b"""H4sIAAAAAAAAA+3OMQ7CMBAEQD/FH0CyjSy/xwVCFJAoCf/HFCAqqEI1U9yudF
+    fceTn17dDnOewnDa3VZ+ZW02e+hHxsrYxRagkp59FDTDv+9HZft77EGNbLdbp9uf
+    u1BwAAAAAAAAAAgD96AGPmdYsAKAAA"""
+)
+HELLO = base64.b64decode(b"aGVsbG8K")
+
+
 def build_server_response(content: bytes):
     return Response(
-        base64.b64decode(content),
+        content,
         status_code=200,
         media_type="application/octet-stream",
     )
@@ -97,11 +111,7 @@ def build_server_response(content: bytes):
 
 @app.get("/1.0.0/dangling-symlink.tar.xz")
 async def serve_dangling_symlink_tar_xz():
-    return build_server_response(
-        b"""/Td6WFoAAATm1rRGAgAhARYAAAB0L+Wj4AX/AGFdADIYSiE4i4ddgZh67LcVqfV6kAa92oeZZszM
-        2Tg8AMYeZqxKzl9Ypxd5dz3hYKZmYWYxihSJZAW6R+XAe2ce+dJboUIlwezUAwemw+f4mQVxSk0S
-        tLV2svttG83alyZFRFwAAAAALhYEWE9UVL0AAX2ADAAAAOjF2Y+xxGf7AgAAAAAEWVo="""
-    )
+    return build_server_response(DANGLING_SYMLINK_TAR_XZ)
 
 
 @app.get("/{version}/{name}")
@@ -114,12 +124,8 @@ async def serve_tar_gz(version: str, name: str):
     if "500" in name:
         raise HTTPException(status_code=500)
     if name.endswith(".tar.gz"):
-        response = b"""H4sIAAAAAAAAA+3OMQ7CMBAEQD/FH0CyjSy/xwVCFJAoCf/HFCAqqEI1U9yudF
-        fceTn17dDnOewnDa3VZ+ZW02e+hHxsrYxRagkp59FDTDv+9HZft77EGNbLdbp9uf
-        u1BwAAAAAAAAAAgD96AGPmdYsAKAAA"""
-    else:
-        response = b"aGVsbG8K"
-    return build_server_response(response)
+        return build_server_response(GREAT_APP_TAR_GZ)
+    return build_server_response(HELLO)
 
 
 @pytest.fixture(scope="function")
@@ -145,8 +151,9 @@ def tmp_working_directory(tmp_path):
         os.chdir(previous_cwd)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def blueprint_factory():
+    # the factory is stateless, validate and dump the base blueprint only once
     blueprint = Blueprint(
         name="great-app",
         version="1.0.0",
@@ -156,13 +163,18 @@ def blueprint_factory():
         fetch="http://great-app.io/releases/{{version}}/great-app.tar.gz",
         script=["cp great-app_linux_{{arch}}_{{version}} {{src}}/usr/bin/great-app"],
     )
+    base_blueprint_dict = blueprint.model_dump(exclude_defaults=True)
+    # tests never mutate blueprints, validated ones are shared between tests
+    blueprints: dict[str, Blueprint] = {}
 
     def _blueprint_factory(construct: bool = False, **kwargs):
-        blueprint_dict = blueprint.model_dump(exclude_defaults=True) | kwargs
-        if construct is False:
-            return Blueprint(**blueprint_dict)
-        else:
+        blueprint_dict = base_blueprint_dict | kwargs
+        if construct is True:
             return Blueprint.model_construct(**blueprint_dict)
+        key = repr(sorted(kwargs.items()))
+        if key not in blueprints:
+            blueprints[key] = Blueprint(**blueprint_dict)
+        return blueprints[key]
 
     return _blueprint_factory
 
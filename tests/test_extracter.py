@@ -1,50 +1,79 @@
+import asyncio
 import base64
+import io
+import shutil
+import tarfile
 from pathlib import Path
 
 import pytest
+import unix_ar
+import zstandard
 
 from ops2deb.exceptions import Ops2debExtractError
 from ops2deb.fetcher import extract_archive, is_archive_format_supported
 
+# archives are decoded once when the module is imported, fixtures only write them
+DEBIAN_PACKAGE = base64.b64decode(
+    b"""ITxhcmNoPgpkZWJpYW4tYmluYXJ5ICAgMTU1NzI2MTA5MCAgMCAgICAgMCAgICAgMTAwNjQ0ICA0
+    ICAgICAgICAgYAoyLjAKY29udHJvbC50YXIueHogIDE1NTcyNjEwOTAgIDAgICAgIDAgICAgIDEw
+    MDY0NCAgNTA4ICAgICAgIGAK/Td6WFoAAATm1rRGBMC6A4BQIQEWAAAAAAAAANJn5+7gJ/8Bsl0A
+    Fwu8HH0BlcAdSj55FcLMJqNZOsvf9I59X9KoocqHYQ0azB90t59hNAb5EjVDgV/WKpgKFddy29jY
+    qi6i7kd2fQzBU0hIaxglDu/0ywroODUYazi6TIEM87WBbYFLnj6qd8Wqd0BJZnaUrBDW30f9ay2Y
+    iSK5Tm+RSxkwUnUidL8fOwc4G3iSb+YcFE4tjMqZzsB3iXy09aUKZHAOgqMfsWI413VrN+qWmq/k
+    EcT8b+7h6V+8hx9tPvO8vm9YpBtOsQqljCimTUom+RRNYlGyyvbdMO2mFznoLZNFFzr2UDIefi0i
+    bbCATw2UbjPn2lb+BOQGIIkepvthCG7H2/eej6RT0xzYd3TAVpo/owQJ5/WYMQP3ntkQXqknKaI+
+    BTFFexH2buKt+yYRgV1BKjjbzq3EDyllvS6K7O5cJ6vfGYTa3FI5dNz1byZejuyAVbTrHRpOct9Y
+    xd5C9Pfk4Rw57eWKoT/uSFwY6nYTdDl+3V4XLB/kecfxsWaWiPwsb+bWOAD7rOLJ9mrnAfr4G8Ej
+    S/V5Tmz3Qfb5CerM192Wsp3Hr0N8sWCbSeCn8q3/P6/LkwAAAADN29w8vEq9MwAB1gOAUAAAtMl3
+    wbHEZ/sCAAAAAARZWmRhdGEudGFyLnh6ICAgICAxNTU3MjYxMDkwICAwICAgICAwICAgICAxMDA2
+    NDQgIDUyOCAgICAgICBgCv03elhaAAAE5ta0RgTAzgOAUCEBFgAAAAAAAACMWyQd4Cf/AcZdABcL
+    vBx9AZXAHUo+eRXCzCajWTrL3/SOfV/SqKHKh2ENGswfdLefYTQG+RI1Q4Ff1iqYChXXctvY2LBN
+    WwNtDSJ5udM5LXLbDOxBbrl8iBf02q1tQRTzPRI59OWOlnoYU0LJ6LfF0kaSs9aMIC45NCmdvED/
+    2CbMIbkDE+RnhcyDeqy9jz0zPINeA/Y0tWkP6jpvcTIbs6ry7GNYUu6HItBtJI+CbAs+gt3qUMYp
+    x85z49jiIKGQwCcmfeCXE8HjMJ17+pjHOhD2P3xt2LkzDdQlod5XzB4/sZNudqCVTBSg9aJ2r0gH
+    4BLjo3kHTIqzzpKSLgsd4y3A3ZTr26KMxoV51DYf5x7fb0Csp3kcm44/w7pJps/RrXcXLcOYNmlO
+    IiIGVe7dK06oCnsMaXR/ru8Qd8YbExZNoPv+q23oHC4hx3c797cHYN1+iiMuRHSjI8dbg3eTAhEd
+    SsiDHDta6pXQ2VHkXGAXP1gpYrvldasQq7xNR3epiYqBKW612hpI3ghzcNRR5jFSem/WJZFhzYOC
+    QUIyE5HGDNLzZ62wiIpGNsNkJxJQoS9cEHKz+pnwgeeyox/AqY7jvg+nVn3pX7eGv/Ot6gAAAABj
+    WR47+Dd1CgAB6gOAUAAAYg7PsrHEZ/sCAAAAAARZWg==
+    """
+)
+BZIP2_ARCHIVE = base64.b64decode(
+    b"QlpoOTFBWSZTWRpUZJIAAAAFAABAAgSgACGaaDNNEzOLuSKcKEgNKjJJAA=="
+)
+GZ_ARCHIVE = base64.b64decode(b"H4sICCqjO2IAA2hlbGxvAPNIzcnJBwCCidH3BQAAAA==")
+ZST_ARCHIVE = base64.b64decode(b"KLUv/SQLWQAASGVsbG8gc2lyIQqkAdJw")
+TAR_ZST_ARCHIVE = base64.b64decode(
+    b"KLUv/QRYvQIAckQPFqCpDQCWnGiqCF+dELPSlpos3N4uRAoGgrSLCispQZTNFmMpxjef1Lv7qPgh8+B"
+    b"ZT+j9N2b+v1ezhLSLjggA9QXwTANUDIUDwFYAkAa41gpXbwJdP2F1GA=="
+)
+
 
 @pytest.fixture
-def decode_and_write(tmp_path):
-    def _decode_and_write(extension: str, content: bytes) -> Path:
+def write_archive(tmp_path):
+    def _write_archive(extension: str, content: bytes) -> Path:
         file_path = tmp_path / f"archive.{extension}"
-        file_path.write_bytes(base64.b64decode(content))
+        file_path.write_bytes(content)
         return file_path
 
-    return _decode_and_write
+    return _write_archive
 
 
 @pytest.fixture
-def debian_package(decode_and_write) -> Path:
-    return decode_and_write(
-        "deb",
-        b"""ITxhcmNoPgpkZWJpYW4tYmluYXJ5ICAgMTU1NzI2MTA5MCAgMCAgICAgMCAgICAgMTAwNjQ0ICA0
-        ICAgICAgICAgYAoyLjAKY29udHJvbC50YXIueHogIDE1NTcyNjEwOTAgIDAgICAgIDAgICAgIDEw
-        MDY0NCAgNTA4ICAgICAgIGAK/Td6WFoAAATm1rRGBMC6A4BQIQEWAAAAAAAAANJn5+7gJ/8Bsl0A
-        Fwu8HH0BlcAdSj55FcLMJqNZOsvf9I59X9KoocqHYQ0azB90t59hNAb5EjVDgV/WKpgKFddy29jY
-        qi6i7kd2fQzBU0hIaxglDu/0ywroODUYazi6TIEM87WBbYFLnj6qd8Wqd0BJZnaUrBDW30f9ay2Y
-        iSK5Tm+RSxkwUnUidL8fOwc4G3iSb+YcFE4tjMqZzsB3iXy09aUKZHAOgqMfsWI413VrN+qWmq/k
-        EcT8b+7h6V+8hx9tPvO8vm9YpBtOsQqljCimTUom+RRNYlGyyvbdMO2mFznoLZNFFzr2UDIefi0i
-        bbCATw2UbjPn2lb+BOQGIIkepvthCG7H2/eej6RT0xzYd3TAVpo/owQJ5/WYMQP3ntkQXqknKaI+
-        BTFFexH2buKt+yYRgV1BKjjbzq3EDyllvS6K7O5cJ6vfGYTa3FI5dNz1byZejuyAVbTrHRpOct9Y
-        xd5C9Pfk4Rw57eWKoT/uSFwY6nYTdDl+3V4XLB/kecfxsWaWiPwsb+bWOAD7rOLJ9mrnAfr4G8Ej
-        S/V5Tmz3Qfb5CerM192Wsp3Hr0N8sWCbSeCn8q3/P6/LkwAAAADN29w8vEq9MwAB1gOAUAAAtMl3
-        wbHEZ/sCAAAAAARZWmRhdGEudGFyLnh6ICAgICAxNTU3MjYxMDkwICAwICAgICAwICAgICAxMDA2
-        NDQgIDUyOCAgICAgICBgCv03elhaAAAE5ta0RgTAzgOAUCEBFgAAAAAAAACMWyQd4Cf/AcZdABcL
-        vBx9AZXAHUo+eRXCzCajWTrL3/SOfV/SqKHKh2ENGswfdLefYTQG+RI1Q4Ff1iqYChXXctvY2LBN
-        WwNtDSJ5udM5LXLbDOxBbrl8iBf02q1tQRTzPRI59OWOlnoYU0LJ6LfF0kaSs9aMIC45NCmdvED/
-        2CbMIbkDE+RnhcyDeqy9jz0zPINeA/Y0tWkP6jpvcTIbs6ry7GNYUu6HItBtJI+CbAs+gt3qUMYp
-        x85z49jiIKGQwCcmfeCXE8HjMJ17+pjHOhD2P3xt2LkzDdQlod5XzB4/sZNudqCVTBSg9aJ2r0gH
-        4BLjo3kHTIqzzpKSLgsd4y3A3ZTr26KMxoV51DYf5x7fb0Csp3kcm44/w7pJps/RrXcXLcOYNmlO
-        IiIGVe7dK06oCnsMaXR/ru8Qd8YbExZNoPv+q23oHC4hx3c797cHYN1+iiMuRHSjI8dbg3eTAhEd
-        SsiDHDta6pXQ2VHkXGAXP1gpYrvldasQq7xNR3epiYqBKW612hpI3ghzcNRR5jFSem/WJZFhzYOC
-        QUIyE5HGDNLzZ62wiIpGNsNkJxJQoS9cEHKz+pnwgeeyox/AqY7jvg+nVn3pX7eGv/Ot6gAAAABj
-        WR47+Dd1CgAB6gOAUAAAYg7PsrHEZ/sCAAAAAARZWg==
-        """,
-    )
+def debian_package(write_archive) -> Path:
+    return write_archive("deb", DEBIAN_PACKAGE)
+
+
+@pytest.fixture(scope="session")
+def extracted_debian_package(tmp_path_factory) -> Path:
+    # extracting the package is the slowest part of this module, tests that only
+    # read the extracted files share a single extraction
+    base_path = tmp_path_factory.mktemp("debian_package")
+    package_path = base_path / "archive.deb"
+    package_path.write_bytes(DEBIAN_PACKAGE)
+    extract_path = base_path / "extracted"
+    asyncio.run(extract_archive(package_path, extract_path))
+    return extract_path
 
 
 @pytest.fixture
@@ -83,13 +112,12 @@ def test_is_archive_format_supported_should_return_true_when_archive_format_is_s
     assert is_archive_format_supported(file_path) is True
 
 
-async def test_extract_archive_should_extract_data_and_control_tar_when_archive_is_a_deb(
-    debian_package, extract_path
+def test_extract_archive_should_extract_data_and_control_tar_when_archive_is_a_deb(
+    extracted_debian_package,
 ):
-    await extract_archive(debian_package, extract_path)
-    assert (extract_path / "control").is_dir()
-    assert (extract_path / "data").is_dir()
-    assert (extract_path / "data/usr/bin/great-app").is_file()
+    assert (extracted_debian_package / "control").is_dir()
+    assert (extracted_debian_package / "data").is_dir()
+    assert (extracted_debian_package / "data/usr/bin/great-app").is_file()
 
 
 async def test_extract_archive_should_raise_read_error_when_archive_is_an_invalid_deb(
@@ -100,41 +128,78 @@ async def test_extract_archive_should_raise_read_error_when_archive_is_an_invali
 
 
 async def test_extract_archive_should_extract_bzip2_archive_when_file_name_ends_with_bz2(
-    extract_path, decode_and_write
+    extract_path, write_archive
 ):
-    archive_path = decode_and_write(
-        "bz2", b"QlpoOTFBWSZTWRpUZJIAAAAFAABAAgSgACGaaDNNEzOLuSKcKEgNKjJJAA=="
-    )
+    archive_path = write_archive("bz2", BZIP2_ARCHIVE)
     await extract_archive(archive_path, extract_path)
     assert (extract_path / "archive").is_file()
     assert (extract_path / "archive").read_text() == "Hello"
 
 
 async def test_extract_archive_should_extract_gz_archive_when_file_name_ends_with_gz(
-    extract_path, decode_and_write
+    extract_path, write_archive
 ):
-    archive_path = decode_and_write("gz", b"H4sICCqjO2IAA2hlbGxvAPNIzcnJBwCCidH3BQAAAA==")
+    archive_path = write_archive("gz", GZ_ARCHIVE)
     await extract_archive(archive_path, extract_path)
     assert (extract_path / "archive").is_file()
     assert (extract_path / "archive").read_text() == "Hello"
 
 
 async def test_extract_archive_should_extract_zst_archive_when_file_name_ends_with_zst(
-    extract_path, decode_and_write
+    extract_path, write_archive
 ):
-    archive_path = decode_and_write("zst", b"KLUv/SQLWQAASGVsbG8gc2lyIQqkAdJw")
+    archive_path = write_archive("zst", ZST_ARCHIVE)
     await extract_archive(archive_path, extract_path)
     assert (extract_path / "archive").is_file()
     assert (extract_path / "archive").read_text() == "Hello sir!\n"
 
 
 async def test_extract_archive_should_extract_tar_zst_archive_when_file_name_ends_with_tar_zst(  # noqa: E501
-    extract_path, decode_and_write
+    extract_path, write_archive
+):
+    archive_path = write_archive("tar.zst", TAR_ZST_ARCHIVE)
+    await extract_archive(archive_path, extract_path)
+    assert (extract_path / "hello.txt").read_text() == "Hello!\n"
+
+
+async def test_extract_archive_should_extract_zst_data_tar_when_archive_is_a_deb(
+    tmp_path, extract_path
 ):
-    archive_path = decode_and_write(
-        "tar.zst",
-        b"KLUv/QRYvQIAckQPFqCpDQCWnGiqCF+dELPSlpos3N4uRAoGgrSLCispQZTNFmMpxjef1Lv7qPgh8+B"
-        b"ZT+j9N2b+v1ezhLSLjggA9QXwTANUDIUDwFYAkAa41gpXbwJdP2F1GA==",
-    )
+    data_tar = io.BytesIO()
+    with tarfile.open(fileobj=data_tar, mode="w") as tar_file:
+        tar_info = tarfile.TarInfo("usr/bin/great-app")
+        tar_info.size = 6
+        tar_file.addfile(tar_info, io.BytesIO(b"Hello\n"))
+    data_tar_zst = zstandard.ZstdCompressor().compress(data_tar.getvalue())
+    package_path = tmp_path / "archive.deb"
+    ar_file = unix_ar.open(str(package_path), "w")
+    for name, content in [("debian-binary", b"2.0\n"), ("data.tar.zst", data_tar_zst)]:
+        ar_info = unix_ar.ArInfo(name, len(content), mtime=0, perms=0o644, uid=0, gid=0)
+        ar_file.addfile(ar_info, io.BytesIO(content))
+    ar_file.close()
+    await extract_archive(package_path, extract_path)
+    assert (extract_path / "data/usr/bin/great-app").read_text() == "Hello\n"
+
+
+@pytest.mark.parametrize("extension", ["tar", "tar.gz", "tar.bz2", "tar.xz"])
+async def test_extract_archive_should_extract_tar_archive_when_file_name_ends_with_tar(
+    extract_path, tmp_path, extension
+):
+    archive_path = tmp_path / f"archive.{extension}"
+    compression = extension.split(".")[-1] if "." in extension else ""
+    with tarfile.open(archive_path, mode=f"w:{compression}") as tar_file:
+        tar_info = tarfile.TarInfo("hello.txt")
+        tar_info.size = 7
+        tar_file.addfile(tar_info, io.BytesIO(b"Hello!\n"))
     await extract_archive(archive_path, extract_path)
     assert (extract_path / "hello.txt").read_text() == "Hello!\n"
+
+
+def test_importing_ops2deb_should_not_replace_shutil_tar_unpackers(tmp_path):
+    archive_path = tmp_path / "archive.tar.gz"
+    with tarfile.open(archive_path, mode="w:gz") as tar_file:
+        tar_info = tarfile.TarInfo("hello.txt")
+        tar_info.size = 7
+        tar_file.addfile(tar_info, io.BytesIO(b"Hello!\n"))
+    shutil.unpack_archive(archive_path, tmp_path / "output", filter="data")
+    assert (tmp_path / "output/hello.txt").read_text() == "Hello!\n"
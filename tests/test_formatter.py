@@ -1,5 +1,3 @@
-import json
-
 import pytest
 
 from ops2deb.formatter import format_blueprint, format_description, sort_blueprints
@@ -54,7 +52,7 @@ def test_format_blueprint__should_remove_default_values():
         description="A description",
     )
     blueprint = Blueprint(**raw_blueprint)
-    raw_blueprint_with_defaults = json.loads(blueprint.model_dump_json())
+    raw_blueprint_with_defaults = blueprint.model_dump(mode="json")
     assert raw_blueprint_with_defaults["revision"] == "1"
     assert format_blueprint(raw_blueprint_with_defaults) == raw_blueprint
 
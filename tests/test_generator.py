@@ -1,12 +1,14 @@
+import errno
 import shutil
 
 import pytest
 
+from ops2deb import generator
 from ops2deb.exceptions import Ops2debGeneratorError
 from ops2deb.generator import BASE_TEMPORARY_DIRECTORY, SourcePackage
 from ops2deb.parser import Blueprint
 
-blueprint_1 = Blueprint(
+blueprint_1 = dict(
     name="great-app",
     version="1.0.0",
     homepage="https://great-app.io",
@@ -40,7 +42,7 @@ Description: My great app
  A detailed description of the super package
 """
 
-blueprint_2 = Blueprint(
+blueprint_2 = dict(
     name="great-app",
     version="1.0.0",
     revision="3",
@@ -69,7 +71,7 @@ Description: My great app
 """
 
 
-blueprint_3 = Blueprint(
+blueprint_3 = dict(
     name="great-app",
     version="1.0.0",
     summary="My great app",
@@ -92,7 +94,7 @@ Description: My great app
 """
 
 
-blueprint_4 = Blueprint(
+blueprint_4 = dict(
     name="great-app",
     version="1.0.0",
     summary="My great app without a description",
@@ -119,8 +121,9 @@ def package_factory(tmp_path):
     return _package_factory
 
 
+# blueprints are validated when tests run, not when the module is collected
 @pytest.mark.parametrize(
-    "blueprint, control",
+    "blueprint_dict, control",
     [
         (blueprint_1, control_1),
         (blueprint_2, control_2),
@@ -129,8 +132,9 @@ def package_factory(tmp_path):
     ],
 )
 def test_generate_should_produce_same_control_file_content_as_the_snapshot(
-    tmp_path, blueprint, control, package_factory
+    tmp_path, blueprint_dict, control, package_factory
 ):
+    blueprint = Blueprint(**blueprint_dict)
     package = package_factory(blueprint)
     package.generate()
     control_file = tmp_path / f"great-app_1.0.0_{blueprint.architecture}/debian/control"
@@ -199,6 +203,29 @@ def test_generate_should_copy_file_when_blueprint_install_contains_a_source_dest
     assert (tmp_path / "great-app_1.0.0_amd64/src/test").read_text() == "test"
 
 
+def test_generate_should_stop_trying_reflinks_when_filesystem_does_not_support_them(
+    tmp_path, blueprint_factory, package_factory, monkeypatch
+):
+    ioctl_calls = []
+
+    def ioctl(*args):
+        ioctl_calls.append(args)
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(generator, "_devices_without_reflinks", set())
+    monkeypatch.setattr(generator.fcntl, "ioctl", ioctl)
+    source = tmp_path / "test"
+    source.mkdir()
+    (source / "a").write_text("a")
+    (source / "b").write_text("b")
+    blueprint = blueprint_factory(fetch=None, install=[f"{source}:/test"], script=[])
+    package = package_factory(blueprint)
+    package.generate()
+    assert (tmp_path / "great-app_1.0.0_amd64/src/test/a").read_text() == "a"
+    assert (tmp_path / "great-app_1.0.0_amd64/src/test/b").read_text() == "b"
+    assert len(ioctl_calls) == 1
+
+
 def test_generate_should_copy_dir_tree_when_blueprint_install_contains_a_source_destination_str_and_source_is_a_dir(  # noqa: E501
     tmp_path, blueprint_factory, package_factory
 ):
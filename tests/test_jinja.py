@@ -2,7 +2,7 @@ import os
 
 import pytest
 
-from ops2deb.jinja import environment
+from ops2deb.jinja import compile_template, environment
 
 
 @pytest.fixture
@@ -41,3 +41,11 @@ def test_rust_target_filter_should_return_input_when_input_is_not_a_debian_arch(
     render_string,
 ):
     assert render_string("{{ 'input_target' | rust_target }}") == "input_target"
+
+
+def test_compile_template_should_reuse_compiled_template_and_still_read_env_on_render():
+    template = compile_template("{{env('SOME_OTHER_VARIABLE')}}")
+    os.environ["SOME_OTHER_VARIABLE"] = "value"
+    assert compile_template("{{env('SOME_OTHER_VARIABLE')}}") is template
+    assert template.render() == "value"
+    os.environ.pop("SOME_OTHER_VARIABLE")
@@ -104,6 +104,22 @@ def test_save__should_not_write_file_when_no_entry_have_been_added_nor_removed(
     mock_dump.assert_not_called()
 
 
+@patch("yaml.dump")
+def test_save__should_not_write_file_when_added_entries_have_been_removed(
+    mock_dump, lockfile_path, lockfile_content
+):
+    # Given
+    lock = LockFile(lockfile_path)
+    lock.add([UrlAndHash("http://tests.com/file.tar.gz", "deadbeef")])
+    lock.remove(["http://tests.com/file.tar.gz"])
+
+    # When
+    lock.save()
+
+    # Then
+    mock_dump.assert_not_called()
+
+
 def test_save__sets_the_same_timestamp_to_added_entries(lockfile_path):
     # Given
     lock = LockFile(lockfile_path)
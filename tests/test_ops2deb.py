@@ -1,16 +1,16 @@
 import json
-import os
-from textwrap import dedent
+import textwrap
+from functools import lru_cache
 
 import pytest
-import ruamel.yaml
 from typer.testing import CliRunner
 
 from ops2deb.cli import app
 from ops2deb.lockfile import LockFile
 from ops2deb.parser import load_configuration_file
 
-yaml = ruamel.yaml.YAML(typ="safe")
+# the same configuration literals are written and compared by many tests
+dedent = lru_cache(maxsize=None)(textwrap.dedent)
 
 configuration_example_0 = """\
 name: great-app
@@ -50,6 +50,16 @@ configuration_example_1 = """\
     - mv super-app {{src}}/usr/bin/super-app
 """
 
+# packages built from configuration_example_0 and configuration_example_1
+built_packages_example = frozenset(
+    {
+        "great-app_1.0.0-1~ops2deb_armhf.deb",
+        "super-app_1.0.0-1~ops2deb_all.deb",
+        "great-app_1.0.0-1~ops2deb_amd64.deb",
+        "awesome-metapackage_1.0.0-1~ops2deb_all.deb",
+    }
+)
+
 
 @pytest.fixture
 def call_ops2deb(
@@ -60,23 +70,22 @@ def call_ops2deb(
     mock_httpx_client,
     lockfile_content,
 ):
+    runner = CliRunner(mix_stderr=False)
+    environment = {
+        "OPS2DEB_VERBOSE": "1",
+        "OPS2DEB_OUTPUT_DIR": str(tmp_path),
+        "OPS2DEB_CACHE_DIR": str(cache_path),
+        "OPS2DEB_CONFIG": str(tmp_path / "*.yml"),
+        "OPS2DEB_EXIT_CODE": "77",
+    }
+
     def _invoke(
         *args,
         configurations: list[str],
     ):
-        runner = CliRunner(mix_stderr=False)
         for index, configuration in enumerate(configurations):
             configuration_paths[index].write_text(dedent(configuration))
-        os.environ.update(
-            {
-                "OPS2DEB_VERBOSE": "1",
-                "OPS2DEB_OUTPUT_DIR": str(tmp_path),
-                "OPS2DEB_CACHE_DIR": str(cache_path),
-                "OPS2DEB_CONFIG": str(tmp_path / "*.yml"),
-                "OPS2DEB_EXIT_CODE": "77",
-            }
-        )
-        result = runner.invoke(app, [*args], catch_exceptions=False)
+        result = runner.invoke(app, [*args], env=environment, catch_exceptions=False)
         print(result.stdout)
         return result
 
@@ -380,12 +389,6 @@ def test_generate__should_fail_gracefully_when_file_is_not_locked_in_lockfile_re
 def test_build__builds_debian_source_packages(tmp_path, call_ops2deb):
     # Given
     configurations = [configuration_example_0, configuration_example_1]
-    expected_package_set = {
-        "great-app_1.0.0-1~ops2deb_armhf.deb",
-        "super-app_1.0.0-1~ops2deb_all.deb",
-        "great-app_1.0.0-1~ops2deb_amd64.deb",
-        "awesome-metapackage_1.0.0-1~ops2deb_all.deb",
-    }
 
     # When
     call_ops2deb("generate", configurations=configurations)
@@ -393,25 +396,19 @@ def test_build__builds_debian_source_packages(tmp_path, call_ops2deb):
 
     # Then
     assert result.exit_code == 0
-    assert set([path.name for path in tmp_path.glob("*.deb")]) == expected_package_set
+    assert set([path.name for path in tmp_path.glob("*.deb")]) == built_packages_example
 
 
 def test_default__generates_and_builds_debian_source_packages(call_ops2deb, tmp_path):
     # Given
     configurations = [configuration_example_0, configuration_example_1]
-    expected_package_set = {
-        "great-app_1.0.0-1~ops2deb_armhf.deb",
-        "super-app_1.0.0-1~ops2deb_all.deb",
-        "great-app_1.0.0-1~ops2deb_amd64.deb",
-        "awesome-metapackage_1.0.0-1~ops2deb_all.deb",
-    }
 
     # When
     result = call_ops2deb("default", configurations=configurations)
 
     # Then
     assert result.exit_code == 0
-    assert set([path.name for path in tmp_path.glob("*.deb")]) == expected_package_set
+    assert set([path.name for path in tmp_path.glob("*.deb")]) == built_packages_example
 
 
 def test_build__exits_with_error_when_build_fails(call_ops2deb, tmp_path):
@@ -619,12 +616,14 @@ def test_update__adds_new_version_and_remove_old_versions_when_max_versions_is_r
     # Then
     raw_blueprints = load_configuration_file(configuration_path).raw_blueprints
     assert raw_blueprints[0]["matrix"]["versions"] == ["1.1.0", "1.1.1"]
-    assert "Add great-app v1.1.1" in summary_path.read_text()
-    assert "Remove great-app v1.0.0\nRemove great-app v1.0.1" in summary_path.read_text()
-    assert "http://testserver/1.0.0/great-app.tar.gz" not in lockfile_path.read_text()
-    assert "http://testserver/1.0.1/great-app.tar.gz" not in lockfile_path.read_text()
-    assert "http://testserver/1.1.0/great-app.tar.gz" in lockfile_path.read_text()
-    assert "http://testserver/1.1.1/great-app.tar.gz" in lockfile_path.read_text()
+    summary = summary_path.read_text()
+    assert "Add great-app v1.1.1" in summary
+    assert "Remove great-app v1.0.0\nRemove great-app v1.0.1" in summary
+    lockfile = lockfile_path.read_text()
+    assert "http://testserver/1.0.0/great-app.tar.gz" not in lockfile
+    assert "http://testserver/1.0.1/great-app.tar.gz" not in lockfile
+    assert "http://testserver/1.1.0/great-app.tar.gz" in lockfile
+    assert "http://testserver/1.1.1/great-app.tar.gz" in lockfile
     assert result.exit_code == 0
 
 
@@ -654,8 +653,9 @@ def test_update__replaces_version_with_versions_matrix_when_max_versions_is_supe
     assert result.exit_code == 0
     assert raw_blueprints[0]["matrix"]["versions"] == ["1.0.0", "1.1.1"]
     assert "Add great-app v1.1.1" in summary_path.read_text()
-    assert "http://testserver/1.0.0/great-app.tar.gz" in lockfile_path.read_text()
-    assert "http://testserver/1.1.1/great-app.tar.gz" in lockfile_path.read_text()
+    lockfile = lockfile_path.read_text()
+    assert "http://testserver/1.0.0/great-app.tar.gz" in lockfile
+    assert "http://testserver/1.1.1/great-app.tar.gz" in lockfile
 
 
 def test_update__creates_a_summary_of_updated_blueprints_when_called_with_output_file_argument(  # noqa: E501
@@ -719,6 +719,27 @@ def test_update__creates_empty_summary_when_called_with_output_file_and_configur
     assert summary_path.read_text() == ""
 
 
+def test_update__skips_blueprints_recently_found_up_to_date_when_cache_ttl_is_set(
+    call_ops2deb,
+):
+    # Given
+    configuration = """
+    name: great-app
+    version: 1.1.1
+    summary: great package
+    fetch: http://testserver/{{version}}/great-app.tar.gz
+    """
+
+    # When
+    args = ["update", "--cache-ttl", "3600"]
+    result_0 = call_ops2deb(*args, configurations=[configuration])
+    result_1 = call_ops2deb(*args, configurations=[configuration])
+
+    # Then
+    assert "great-app - Trying" in result_0.stderr
+    assert "great-app - Trying" not in result_1.stderr
+
+
 def test_update__resets_blueprint_revision_to_one_when_a_new_release_is_available(
     call_ops2deb, configuration_path
 ):
@@ -1203,10 +1224,10 @@ def test_delta__outputs_a_json_when_json_option_is_used(
     "subcommand", ["update", "generate", "format", "validate", "lock", "delta"]
 )
 def test_ops2deb__exits_with_error_code_when_configuration_file_has_invalid_yaml(
-    call_ops2deb, subcommand, configuration_path
+    call_ops2deb, subcommand, configuration_path, monkeypatch
 ):
     # Given
-    os.environ["OPS2DEB_REPOSITORY"] = "http://deb.wakemeops.com stable"
+    monkeypatch.setenv("OPS2DEB_REPOSITORY", "http://deb.wakemeops.com stable")
     configuration = """\
     - name: awesome-metapackage
         version: 1.0.0
@@ -1224,10 +1245,10 @@ def test_ops2deb__exits_with_error_code_when_configuration_file_has_invalid_yaml
     "subcommand", ["update", "generate", "format", "validate", "lock", "delta"]
 )
 def test_ops2deb__exits_with_error_code_when_configuration_file_has_validation_error(
-    call_ops2deb, subcommand, configuration_path
+    call_ops2deb, subcommand, configuration_path, monkeypatch
 ):
     # Given
-    os.environ["OPS2DEB_REPOSITORY"] = "http://deb.wakemeops.com stable"
+    monkeypatch.setenv("OPS2DEB_REPOSITORY", "http://deb.wakemeops.com stable")
     configuration = """\
     - name: awesome-metapackage
     """
@@ -1,17 +1,22 @@
+import asyncio
+import time
 from typing import Optional
 
 import httpx
 import pytest
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from httpx import AsyncClient
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
+from ops2deb import updater
 from ops2deb.exceptions import Ops2debUpdaterError
 from ops2deb.logger import enable_debug
 from ops2deb.updater import (
     BaseUpdateStrategy,
     GenericUpdateStrategy,
+    GithubTokenPool,
     GithubUpdateStrategy,
+    HostLimiter,
 )
 
 enable_debug(True)
@@ -69,6 +74,129 @@ async def test_try_version__returns_false_when_fetch_url_does_not_depend_on_the_
     assert result is False
 
 
+async def test_generic_update_strategy_does_not_send_requests_when_fetch_url_is_static(
+    blueprint_factory,
+):
+    # Given
+    blueprint = blueprint_factory(
+        version="1.0.0",
+        fetch="http://test/releases/latest/some-app.tar.gz",
+    )
+    app = FastAPI(debug=True)
+    versions = []
+
+    @app.head("/releases/{version}/some-app.tar.gz")
+    def download_release(version: str):
+        versions.append(version)
+
+    # When
+    async with AsyncClient(app=app) as client:
+        update_strategy = GenericUpdateStrategy(client)
+        latest_version = await update_strategy(blueprint)
+
+    # Then
+    assert latest_version == "1.0.0"
+    assert versions == []
+
+
+async def test_generic_update_strategy_finds_latest_release_when_fetch_url_uses_major_version(  # noqa: E501
+    blueprint_factory,
+):
+    # Given
+    blueprint = blueprint_factory(
+        version="1.0.0",
+        fetch="http://test/releases/v{{version.split('.')[0]}}/some-app.tar.gz",
+    )
+    app = FastAPI(debug=True)
+
+    @app.head("/releases/{major}/some-app.tar.gz")
+    def download_release(major: str):
+        if major not in ["v1", "v2"]:
+            raise HTTPException(status_code=404)
+
+    # When
+    async with AsyncClient(app=app) as client:
+        update_strategy = GenericUpdateStrategy(client)
+        latest_version = await update_strategy(blueprint)
+
+    # Then
+    assert latest_version == "2.0.0"
+
+
+async def test_find_latest_versions_should_not_fail_when_github_fetch_url_is_static(
+    blueprint_factory, github_app_factory, monkeypatch
+):
+    # Given
+    monkeypatch.delenv(GithubUpdateStrategy.github_token_env_variable, raising=False)
+    monkeypatch.delenv(GithubUpdateStrategy.github_tokens_env_variable, raising=False)
+    app = github_app_factory("2.0.0")
+    monkeypatch.setattr(updater, "client_factory", lambda: AsyncClient(app=app))
+    url = "https://github.com/owner/name/releases/latest/download/some-app.tar.gz"
+    blueprint = blueprint_factory(version="1.0.0", fetch=url)
+
+    # When
+    result = await updater._find_latest_versions([blueprint])
+
+    # Then
+    assert result == ([], [])
+
+
+async def test_try_version__falls_back_to_ranged_get_when_server_refuses_head_requests(
+    blueprint_factory,
+):
+    # Given
+    blueprint = blueprint_factory(
+        version="1.0.0",
+        fetch="http://test/releases/{{version}}/some-app.tar.gz",
+    )
+    app = FastAPI(debug=True)
+    methods = []
+
+    @app.api_route("/releases/{version}/some-app.tar.gz", methods=["GET", "HEAD"])
+    def download_release(version: str, request: Request):
+        methods.append(request.method)
+        if request.method == "HEAD":
+            raise HTTPException(status_code=405)
+        if version != "2.0.0":
+            raise HTTPException(status_code=404)
+        assert request.headers["range"] == "bytes=0-0"
+        return Response(b"x", status_code=206)
+
+    # When
+    async with AsyncClient(app=app) as client:
+        update_strategy = BaseUpdateStrategy(client)
+        assert await update_strategy.try_version(blueprint, "2.0.0") is True
+        assert await update_strategy.try_version(blueprint, "3.0.0") is False
+
+    # Then
+    assert methods == ["HEAD", "GET", "GET"]
+
+
+async def test_try_version__does_not_retry_with_get_when_head_request_is_forbidden(
+    blueprint_factory,
+):
+    # Given
+    blueprint = blueprint_factory(
+        version="1.0.0",
+        fetch="http://test/releases/{{version}}/some-app.tar.gz",
+    )
+    app = FastAPI(debug=True)
+    methods = []
+
+    @app.api_route("/releases/{version}/some-app.tar.gz", methods=["GET", "HEAD"])
+    def download_release(version: str, request: Request):
+        methods.append(request.method)
+        raise HTTPException(status_code=403)
+
+    # When
+    async with AsyncClient(app=app) as client:
+        update_strategy = BaseUpdateStrategy(client)
+        assert await update_strategy.try_version(blueprint, "2.0.0") is False
+
+    # Then
+    assert methods == ["HEAD"]
+
+
 @pytest.mark.parametrize(
     "versions,expected_result",
     [
@@ -80,6 +208,8 @@ async def test_try_version__returns_false_when_fetch_url_does_not_depend_on_the_
         (["1.0.0", "2.0.3"], "2.0.3"),
         (["1.0.0", "1.1.0", "2.0.0"], "1.1.0"),
         (["1.0.0", "1.0.1", "1.0.2", "1.1.0", "1.1.1"], "1.1.1"),
+        ([f"1.{minor}.0" for minor in range(41)], "1.40.0"),
+        ([f"1.0.{patch}" for patch in range(101)], "1.0.100"),
     ],
 )
 async def test_generic_update_strategy_finds_latest_release_version(
@@ -101,6 +231,69 @@ async def test_generic_update_strategy_finds_latest_release_version(
     assert latest_version == expected_result
 
 
+async def test_generic_update_strategy_sends_few_requests_when_blueprint_is_up_to_date(
+    blueprint_factory,
+):
+    # Given
+    blueprint = blueprint_factory(
+        version="1.0.0",
+        fetch="http://test/releases/{{version}}/some-app.tar.gz",
+    )
+    app = FastAPI(debug=True)
+    versions = []
+
+    @app.head("/releases/{version}/some-app.tar.gz")
+    def download_release(version: str):
+        versions.append(version)
+        raise HTTPException(status_code=404)
+
+    # When
+    async with AsyncClient(app=app) as client:
+        update_strategy = GenericUpdateStrategy(client)
+        latest_version = await update_strategy(blueprint)
+
+    # Then
+    assert latest_version == "1.0.0"
+    assert sorted(versions) == [
+        "1.0.1",
+        "1.1.0",
+        "1.1.1",
+        "1.1.2",
+        "1.1.3",
+        "2.0.0",
+        "2.0.1",
+        "2.0.2",
+        "2.0.3",
+    ]
+
+
+async def test_generic_update_strategy_ignores_major_probe_errors_when_a_minor_release_exists(  # noqa: E501
+    blueprint_factory,
+):
+    # Given
+    blueprint = blueprint_factory(
+        version="1.0.0",
+        fetch="http://test/releases/{{version}}/some-app.tar.gz",
+    )
+    app = FastAPI(debug=True)
+
+    @app.head("/releases/{version}/some-app.tar.gz")
+    def download_release(version: str):
+        if version == "1.1.0":
+            return
+        if not version.startswith("1."):
+            raise HTTPException(status_code=500)
+        raise HTTPException(status_code=404)
+
+    # When
+    async with AsyncClient(app=app) as client:
+        update_strategy = GenericUpdateStrategy(client)
+        latest_version = await update_strategy(blueprint)
+
+    # Then
+    assert latest_version == "1.1.0"
+
+
 async def test_generic_update_strategy_finds_latest_release_version_when_version_has_prerelease_part(  # noqa: E501
     blueprint_factory, app_factory
 ):
@@ -159,3 +352,161 @@ async def test_github_update_strategy_should_fail_gracefully_when_asset_not_foun
         with pytest.raises(Ops2debUpdaterError) as e:
             await GithubUpdateStrategy(client)(blueprint)
         assert "Failed to determine latest release URL" in str(e)
+
+
+async def test_github_update_strategy_should_not_send_head_request_for_listed_assets(
+    blueprint_factory,
+):
+    app = FastAPI(debug=True)
+    asset_url = "https://github.com/owner/name/releases/2.3.0/some-app.tar.gz"
+
+    @app.get("/repos/owner/name/releases/latest")
+    def github_release_api():
+        return {"tag_name": "2.3.0", "assets": [{"browser_download_url": asset_url}]}
+
+    url = "https://github.com/owner/name/releases/{{version}}/some-app.tar.gz"
+    blueprint = blueprint_factory(fetch=url)
+    async with AsyncClient(app=app) as client:
+        update_strategy = GithubUpdateStrategy(client)
+        assert await update_strategy(blueprint) == "2.3.0"
+
+
+async def test_github_update_strategy_should_prefer_release_over_current_prerelease(
+    blueprint_factory, github_app_factory
+):
+    app = github_app_factory("2.3.0")
+    url = "https://github.com/owner/name/releases/{{version}}/some-app.tar.gz"
+    blueprint = blueprint_factory(version="2.3.0-rc.1", fetch=url)
+    async with AsyncClient(app=app) as client:
+        update_strategy = GithubUpdateStrategy(client)
+        assert await update_strategy(blueprint) == "2.3.0"
+
+
+async def test_github_update_strategy_should_use_cached_release_when_api_replies_with_304(
+    blueprint_factory, tmp_path
+):
+    app = FastAPI(debug=True)
+    api_status_codes = []
+
+    @app.head("/owner/name/releases/{version}/some-app.tar.gz")
+    def github_asset(version: str):
+        if version != "2.3.0":
+            raise HTTPException(status_code=404)
+
+    @app.get("/repos/owner/name/releases/latest")
+    def github_release_api(request: Request):
+        if request.headers.get("if-none-match") == '"v1"':
+            api_status_codes.append(304)
+            return Response(status_code=304)
+        api_status_codes.append(200)
+        return JSONResponse({"tag_name": "2.3.0"}, headers={"etag": '"v1"'})
+
+    url = "https://github.com/owner/name/releases/{{version}}/some-app.tar.gz"
+    blueprint = blueprint_factory(fetch=url)
+    async with AsyncClient(app=app) as client:
+        for _ in range(2):
+            update_strategy = GithubUpdateStrategy(client, cache_directory=tmp_path)
+            assert await update_strategy(blueprint) == "2.3.0"
+    assert api_status_codes == [200, 304]
+
+
+async def test_github_update_strategy_should_request_each_repository_release_once(
+    blueprint_factory, github_app_factory
+):
+    app = github_app_factory("2.3.0")
+    api_requests = []
+
+    @app.middleware("http")
+    async def count_api_requests(request: Request, call_next):
+        if request.url.path.startswith("/repos/"):
+            api_requests.append(request.url.path)
+        return await call_next(request)
+
+    url = "https://github.com/owner/name/releases/{{version}}/some-app.tar.gz"
+    blueprints = [blueprint_factory(name=f"app{i}", fetch=url) for i in range(3)]
+    pending_releases = {}
+    async with AsyncClient(app=app) as client:
+        update_strategies = [
+            GithubUpdateStrategy(client, pending_releases=pending_releases)
+            for _ in blueprints
+        ]
+        results = await asyncio.gather(
+            *[strategy(b) for strategy, b in zip(update_strategies, blueprints)]
+        )
+    assert results == ["2.3.0"] * 3
+    assert api_requests == ["/repos/owner/name/releases/latest"]
+
+
+async def test_github_update_strategy_should_use_latest_releases_found_with_graphql_api(
+    blueprint_factory, monkeypatch
+):
+    app = FastAPI(debug=True)
+
+    asset_url = "https://github.com/owner/name/releases/v2.3.0/some-app.tar.gz"
+
+    @app.post("/graphql")
+    async def github_graphql_api(request: Request):
+        assert request.headers["authorization"] == "bearer token"
+        query = (await request.json())["query"]
+        assert 'repository(owner: "owner", name: "name")' in query
+        assets = {"nodes": [{"downloadUrl": asset_url}]}
+        release = {"tagName": "v2.3.0", "releaseAssets": assets}
+        return JSONResponse({"data": {"r0": {"latestRelease": release}}})
+
+    monkeypatch.setenv(GithubUpdateStrategy.github_token_env_variable, "token")
+    url = "https://github.com/owner/name/releases/v{{version}}/some-app.tar.gz"
+    blueprints = [blueprint_factory(fetch=url), blueprint_factory()]
+    async with AsyncClient(app=app) as client:
+        strategy = GithubUpdateStrategy
+        releases = await strategy.get_latest_github_releases(client, blueprints)
+        assets = [{"browser_download_url": asset_url}]
+        assert releases == {("owner", "name"): {"tag_name": "v2.3.0", "assets": assets}}
+        update_strategy = GithubUpdateStrategy(client, latest_releases=releases)
+        assert await update_strategy(blueprints[0]) == "2.3.0"
+
+
+async def test_github_update_strategy_should_not_use_graphql_api_without_token(
+    blueprint_factory, monkeypatch
+):
+    monkeypatch.delenv(GithubUpdateStrategy.github_token_env_variable, raising=False)
+    url = "https://github.com/owner/name/releases/v{{version}}/some-app.tar.gz"
+    async with AsyncClient(app=FastAPI()) as client:
+        blueprints = [blueprint_factory(fetch=url)]
+        strategy = GithubUpdateStrategy
+        assert await strategy.get_latest_github_releases(client, blueprints) == {}
+
+
+async def test_host_limiter_should_limit_simultaneous_requests_to_the_same_host():
+    limiter = HostLimiter(max_requests_per_host=2)
+    in_flight: dict[str, int] = {"a": 0, "b": 0}
+    max_in_flight: dict[str, int] = {"a": 0, "b": 0}
+
+    async def request(host: str):
+        async with limiter.limit(f"http://{host}/file"):
+            in_flight[host] += 1
+            max_in_flight[host] = max(max_in_flight[host], in_flight[host])
+            await asyncio.sleep(0.01)
+            in_flight[host] -= 1
+
+    await asyncio.gather(*[request(host) for host in ["a", "b"] * 5])
+    assert max_in_flight == {"a": 2, "b": 2}
+
+
+def test_github_token_pool_should_skip_tokens_with_exhausted_rate_limit():
+    tokens = GithubTokenPool(["a", "b", "c"])
+    headers = {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "9999999999"}
+    tokens.update("b", httpx.Response(200, headers=headers))
+    assert [tokens.get() for _ in range(4)] == ["a", "c", "a", "c"]
+
+
+async def test_host_limiter_should_limit_request_rate_to_the_same_host():
+    limiter = HostLimiter(max_requests_per_host=100, max_requests_per_second=50)
+
+    async def request():
+        async with limiter.limit("http://a/file"):
+            pass
+
+    start = time.monotonic()
+    await asyncio.gather(*[request() for _ in range(75)])
+    # the first 50 requests are a burst, the next 25 take half a second
+    assert time.monotonic() - start >= 0.45
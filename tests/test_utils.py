@@ -1,18 +1,11 @@
-import os
-from pathlib import Path
+from ops2deb.utils import write_text_atomically
 
-from ops2deb.utils import working_directory
 
-
-def test_working_directory__sets_current_working_directory_within_context(tmp_path):
-    origin = Path().absolute()
-    with working_directory(tmp_path):
-        assert Path(os.getcwd()) != origin
-        assert Path(os.getcwd()) == tmp_path
-
-
-def test_working_directory__restores_current_directory_when_context_is_left(tmp_path):
-    origin = Path().absolute()
-    with working_directory(tmp_path):
-        pass
-    assert Path(os.getcwd()) == origin
+def test_write_text_atomically__replaces_file_content_and_keeps_its_mode(tmp_path):
+    path = tmp_path / "file.yml"
+    path.write_text("old")
+    path.chmod(0o640)
+    write_text_atomically(path, "new")
+    assert path.read_text() == "new"
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert list(tmp_path.iterdir()) == [path]